@@ -1,59 +1,231 @@
 import os
+import re
 import time
+import random
+import heapq
+import itertools
 import logging
 import numpy as np
 from datetime import datetime, timedelta
 import av
+from av.video.reformatter import VideoReformatter
 import json
 import hashlib
+from collections import OrderedDict
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from flask import current_app
 from models import (
-    ChatKeyword, FlaggedObject, DetectionLog, Stream, User, Assignment,
+    ChatKeyword, FlaggedObject, DetectionLog, Stream, User,
     ChaturbateStream, StripchatStream
 )
 from extensions import db
-from utils.notifications import emit_notification, emit_stream_update
-from sqlalchemy.orm import joinedload, with_polymorphic
+from utils.notifications import emit_notification_batch, emit_stream_updates
+from utils.keyword_matching import get_keyword_matcher, match_flagged_keywords
+from utils.stream_lookup import STREAM_POLY, lookup_stream
+from sqlalchemy import case, event, func, update
+from sqlalchemy.orm import selectinload
 import gevent
 from gevent.pool import Pool
+from gevent.threadpool import ThreadPool
 from gevent.event import Event
-from audio_processing import process_audio_segment, log_audio_detection
-from video_processing import process_video_frame, log_video_detection
+from gevent.lock import RLock, Semaphore
+from gevent.queue import Queue, Full, Empty
+from audio_processing import load_whisper_model, process_audio_segment, log_audio_detection, cleanup_audio_resources
+from video_processing import process_video_frame, log_video_detection, cleanup_video_resources
 from chat_processing import (
     fetch_chat_messages, process_chat_messages, log_chat_detection,
     initialize_chat_globals, load_sentiment_analyzer, fetch_chaturbate_room_uid, configure_smart_filter
 )
 from dotenv import load_dotenv
 import psutil
-import cv2
 from services.notification_service import NotificationService
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
 # Load environment variables
 load_dotenv()
 
+class _CachedTimeFormatter(logging.Formatter):
+    """Formatter that renders the asctime stamp once per second instead of per record."""
+    _second = None
+    _stamp = ''
+
+    def formatTime(self, record, datefmt=None):
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        if second != self._second:
+            self._second = second
+            self._stamp = time.strftime(self.default_time_format, self.converter(record.created))
+        return self.default_msec_format % (self._stamp, record.msecs)
+
 # Configure logging
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(_CachedTimeFormatter('%(asctime)s [%(levelname)s] %(message)s'))
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[logging.StreamHandler()]
+    handlers=[_log_handler]
 )
 logger = logging.getLogger(__name__)
 
+class ProcessorRegistry:
+    """Registry of per-stream processors keyed by stream ID.
+
+    Entries drop themselves once every long-running task of a stream has
+    exited, so processors that died without stop_monitoring do not linger.
+    """
+    LONG_RUNNING_TASKS = ('demux_task', 'video_task', 'audio_task')
+
+    def __init__(self):
+        self._processors = {}
+        self._lock = Semaphore()
+
+    def __contains__(self, stream_id):
+        return stream_id in self._processors
+
+    def __len__(self):
+        return len(self._processors)
+
+    def get(self, stream_id, default=None):
+        return self._processors.get(stream_id, default)
+
+    def register(self, stream_id, media):
+        """Add a stream's processor and watch its long-running tasks."""
+        with self._lock:
+            self._processors[stream_id] = media
+        for key in self.LONG_RUNNING_TASKS:
+            if media.get(key):
+                media[key].link(lambda _task, media=media: self._on_task_exit(stream_id, media))
+
+    def pop(self, stream_id, default=None):
+        with self._lock:
+            return self._processors.pop(stream_id, default)
+
+    def _on_task_exit(self, stream_id, media):
+        # Chat-only or chat-enabled entries are stopped explicitly by the chat pass
+        if 'chat_args' in media:
+            return
+        if all(media[key] is None or media[key].dead for key in self.LONG_RUNNING_TASKS):
+            with self._lock:
+                if self._processors.get(stream_id) is media:
+                    del self._processors[stream_id]
+                    logger.info('Removed processor for stream %s after its tasks exited.', stream_id)
+
 # Global variables
 _whisper_model = None
 _yolo_model = None
+_yolo_net = None  # cv2.dnn network for the exported ONNX model, if configured
+_yolo_device = 'cpu'
 _sentiment_analyzer = None
 last_visual_alerts = {}
 last_chat_alerts = {}
-stream_processors = {}  # Stream URL -> (cancel_event, video_task, audio_task, chat_task)
+stream_processors = ProcessorRegistry()  # Stream ID -> {'stream_url', 'cancel', 'container', 'video_q', 'audio_q', 'demux_task', 'video_task', 'audio_task', 'chat_task', 'chat_args'}
 agent_cache = {}
 all_agents_fetched = False
-gevent_pool = Pool(15)  # Initial pool size, adjusted in initialize_monitoring
+_agent_fetch_lock = Semaphore()
+gevent_pool = Pool(15)  # Bounds scheduled per-stream passes; size adjusted in initialize_monitoring
+FLAGGED_CACHE_TTL = float(os.getenv('FLAGGED_CACHE_TTL', 60))
+_flagged_cache = {}  # 'keywords'/'objects' -> (fetched_at, value)
+_flagged_cache_lock = RLock()
 
 # Directory for transcriptions
 TRANSCRIPTION_DIR = os.getenv('TRANSCRIPTION_DIR', '/home/kvsh1m/LiveStream_Monitoring_Vue3_Flask/backend/transcriptions/')
 
+# Online streams shared by the periodic passes (detached snapshots)
+ONLINE_STREAMS_TTL = float(os.getenv('ONLINE_STREAMS_TTL', 30))
+_online_streams_cache = {'fetched_at': 0.0, 'streams': None}
+
+# Short-lived cache of stream status polled by the detection loops
+STREAM_STATUS_TTL = float(os.getenv('STREAM_STATUS_TTL', 5))
+_stream_status_cache = {}  # Stream ID -> (fetched_at, status or _MISSING)
+_MISSING = object()
+
+# How long a detection greenlet trusts the platform/streamer it resolved at startup
+STREAM_INFO_REFRESH = 300
+
+# Emoji/pictograph runs trigger VADER's quadratic emoticon handling
+EMOTICON_RE = re.compile(r'[\U0001F300-\U0001FAFF\U00002600-\U000027BF]')
+MAX_CHAT_EMOTICONS = 32
+MAX_CHAT_MESSAGE_LENGTH = 4096
+
+# Periodic per-stream work is fired from one scheduler greenlet
+_schedule = []  # heap of (next_fire, seq, stream_id or None for periodic tasks, kind or task name)
+_periodic_tasks = {}  # Task name -> (func, interval, args)
+_chat_last_success = {}  # Room URL -> time of last successful periodic chat pass
+CHAT_LAST_SUCCESS_MAX = 10000
+PERIODIC_CHAT_CONCURRENCY = int(os.getenv('PERIODIC_CHAT_CONCURRENCY', 32))
+CHAT_RETRY_MAX_BACKOFF = 60
+RESTART_STOP_CONCURRENCY = 16
+_schedule_seq = itertools.count()
+_schedule_wakeup = Event()
+_scheduler_task = None
+CHAT_ERROR_BACKOFF = 10
+
+# Stream updates are coalesced per stream and broadcast once per flush window
+STREAM_UPDATE_FLUSH_INTERVAL = float(os.getenv('STREAM_UPDATE_FLUSH_INTERVAL', 0.5))
+_stream_update_buffer = {}  # Stream ID -> merged update payload
+_stream_update_flush = None
+
+# Admin alerts are sent off the scheduler path by a background greenlet
+ADMIN_ALERT_BATCH_SIZE = 50
+_admin_alert_q = Queue()
+_admin_alert_sender = None
+
+# Transcription files are written by a background greenlet
+_transcription_q = Queue(maxsize=256)
+_transcription_writer = None
+
+# Shared HTTP session for stream availability probes (keeps connections alive across greenlets)
+PROBE_POOL_SIZE = int(os.getenv('PROBE_POOL_SIZE', 32))
+PROBE_CACHE_TTL = float(os.getenv('PROBE_CACHE_TTL', 5))
+_probe_session = requests.Session()
+_probe_adapter = HTTPAdapter(
+    pool_connections=PROBE_POOL_SIZE,
+    pool_maxsize=PROBE_POOL_SIZE,
+    max_retries=Retry(total=2, backoff_factor=0.5, status_forcelist=(502, 503, 504), allowed_methods=frozenset(['HEAD', 'GET']))
+)
+_probe_session.mount('http://', _probe_adapter)
+_probe_session.mount('https://', _probe_adapter)
+_availability_cache = OrderedDict()  # Stream URL -> (checked_at, available), least recently probed first
+PROBE_CACHE_SIZE = int(os.getenv('PROBE_CACHE_SIZE', 1024))  # M3U8 URLs carry rotating tokens, so keys keep changing
+AUTO_START_PROBE_TTL = float(os.getenv('AUTO_START_PROBE_TTL', 60))  # Auto-start reuses probes this recent
+PROBE_RANGE_BYTES = 2048
+PROBE_DRAIN_BYTES = 65536  # Larger leftovers are cheaper to drop with the connection than to read
+
+# Whisper consumes 16 kHz mono float32
+WHISPER_SAMPLE_RATE = 16000
+
+# Per-stream packet queue depths between the shared demuxer and its consumers; audio is
+# bounded by duration (AUDIO_SAMPLE_DURATION by default) with a packet-count backstop
+VIDEO_PACKET_QUEUE_SIZE = int(os.getenv('VIDEO_PACKET_QUEUE_SIZE', 8))
+AUDIO_PACKET_QUEUE_SIZE = int(os.getenv('AUDIO_PACKET_QUEUE_SIZE', 2048))
+AUDIO_QUEUE_SECONDS = os.getenv('AUDIO_QUEUE_SECONDS')
+
+# FFmpeg's network reads block natively, so opening and demuxing run on native threads
+DEMUX_THREADS = int(os.getenv('DEMUX_THREADS', 32))
+DEMUX_BATCH_PACKETS = 64
+DEMUX_BATCH_SECONDS = 0.5
+_demux_threadpool = None
+
+# FFmpeg HLS demuxer options: persistent, pipelined segment fetches with reconnects
+HLS_INPUT_OPTIONS = {
+    'http_persistent': '1',
+    'http_multiple': '1',
+    'reconnect': '1',
+    'reconnect_streamed': '1',
+    'reconnect_delay_max': '5'
+}
+
 def initialize_monitoring():
     """Initialize all monitoring components with resource monitoring."""
     logger.info('Initializing monitoring globals.')
@@ -65,17 +237,19 @@ def initialize_monitoring():
     available_memory_gb = memory_info.available / (1024 ** 3)  # Convert to GB
     max_tasks = max(10, min(cpu_count * 4, int(available_memory_gb * 2)))
     gevent_pool = Pool(max_tasks)
-    logger.info(f'Initialized gevent pool with {max_tasks} workers based on {cpu_count} CPUs and {available_memory_gb:.2f} GB available memory.')
+    logger.info('Initialized gevent pool with %s workers based on %s CPUs and %.2f GB available memory.', max_tasks, cpu_count, available_memory_gb)
+    start_transcription_writer()
     
     # Log configuration status
-    logger.info(f'Monitoring configurations: '
-                f'ENABLE_MONITORING={os.getenv("ENABLE_MONITORING", "true")}, '
-                f'ENABLE_VIDEO_MONITORING={os.getenv("ENABLE_VIDEO_MONITORING", "true")}, '
-                f'ENABLE_AUDIO_MONITORING={os.getenv("ENABLE_AUDIO_MONITORING", "true")}, '
-                f'ENABLE_CHAT_MONITORING={os.getenv("ENABLE_CHAT_MONITORING", "true")}')
+    logger.info('Monitoring configurations: '
+                'ENABLE_MONITORING=%s, ENABLE_VIDEO_MONITORING=%s, ENABLE_AUDIO_MONITORING=%s, ENABLE_CHAT_MONITORING=%s',
+                os.getenv('ENABLE_MONITORING', 'true'),
+                os.getenv('ENABLE_VIDEO_MONITORING', 'true'),
+                os.getenv('ENABLE_AUDIO_MONITORING', 'true'),
+                os.getenv('ENABLE_CHAT_MONITORING', 'true'))
     
     # Load models
-    load_whisper_model()
+    _whisper_model = load_whisper_model()
     load_yolo_model()
     load_sentiment_analyzer()
     
@@ -86,16 +260,18 @@ def initialize_monitoring():
             whisper_model=_whisper_model
         )
     except ImportError as e:
-        logger.warning(f'Failed to initialize audio processing: {e}')
+        logger.warning('Failed to initialize audio processing: %s', e)
     
     # Initialize video processing
     try:
         from video_processing import initialize_video_globals
         initialize_video_globals(
-            yolo_model=_yolo_model
+            yolo_model=_yolo_model,
+            yolo_net=_yolo_net,
+            yolo_device=_yolo_device
         )
     except ImportError as e:
-        logger.warning(f'Failed to initialize video processing: {e}')
+        logger.warning('Failed to initialize video processing: %s', e)
     
     # Initialize chat processing
     try:
@@ -108,45 +284,71 @@ def initialize_monitoring():
             time_window_minutes=float(os.getenv('CHAT_ALERT_COOLDOWN', 60)) / 60
         )
     except ImportError as e:
-        logger.warning(f'Failed to initialize chat processing: {e}')
-
-def load_whisper_model():
-    """Load Whisper model for audio processing."""
-    global _whisper_model
-    if _whisper_model is None:
-        try:
-            import whisper
-            model_size = os.getenv('WHISPER_MODEL_SIZE', 'tiny')
-            logger.info(f'Loading Whisper model: {model_size}')
-            _whisper_model = whisper.load_model(model_size)
-            logger.info(f'Whisper model "{model_size}" loaded.')
-        except ImportError as e:
-            logger.error(f'Failed to import Whisper model: {e}')
-            _whisper_model = None
-        except Exception as e:
-            logger.error(f'Error loading Whisper model: {e}')
-            _whisper_model = None
-    return _whisper_model
+        logger.warning('Failed to initialize chat processing: %s', e)
+    
+    # Warm the agent cache so assignment lookups never query per agent
+    fetch_all_agents()
 
 def load_yolo_model():
     """Load YOLO model for video processing."""
-    global _yolo_model
+    global _yolo_model, _yolo_device
     if _yolo_model is None:
         try:
             from ultralytics import YOLO
             import torch
-            logger.info(f'PyTorch version: {torch.__version__}')
+            logger.info('PyTorch version: %s', torch.__version__)
             torch.backends.nnpack.enabled = False
             _yolo_model = YOLO('yolo11n.pt', verbose=False)
+            if torch.cuda.is_available():
+                _yolo_device = 'cuda:0'
+                engine_path = os.getenv('YOLO_TENSORRT_ENGINE')
+                if engine_path:
+                    if not os.path.exists(engine_path):
+                        logger.info('Exporting YOLO model to TensorRT engine: %s', engine_path)
+                        os.replace(_yolo_model.export(format='engine', half=True, imgsz=640, device=0), engine_path)
+                    _yolo_model = YOLO(engine_path, task='detect', verbose=False)
+                else:
+                    _yolo_model.to(_yolo_device)
+                logger.info('YOLO inference on %s', torch.cuda.get_device_name(0))
             logger.info('YOLO model loaded successfully')
         except ImportError as e:
-            logger.error(f'Failed to import YOLO model: {e}')
+            logger.error('Failed to import YOLO model: %s', e)
             _yolo_model = None
         except Exception as e:
-            logger.error(f'Error loading YOLO model: {e}')
+            logger.error('Error loading YOLO model: %s', e)
             _yolo_model = None
+    load_yolo_net()
     return _yolo_model
 
+def load_yolo_net():
+    """Load the quantized ONNX export of the YOLO model through cv2.dnn.
+
+    Enabled by setting YOLO_ONNX_PATH. If the file does not exist yet it is
+    exported once from the loaded ultralytics model.
+    """
+    global _yolo_net
+    onnx_path = os.getenv('YOLO_ONNX_PATH')
+    if _yolo_net is not None or not onnx_path:
+        return _yolo_net
+    try:
+        import cv2
+        if not os.path.exists(onnx_path):
+            if _yolo_model is None:
+                logger.warning('YOLO ONNX model %s missing and no YOLO model to export from', onnx_path)
+                return None
+            logger.info('Exporting YOLO model to ONNX: %s', onnx_path)
+            exported = _yolo_model.export(format='onnx', int8=True, half=False, dynamic=False, imgsz=640)
+            os.replace(exported, onnx_path)
+        net = cv2.dnn.readNetFromONNX(onnx_path)
+        net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        _yolo_net = net
+        logger.info('YOLO ONNX model loaded via cv2.dnn: %s', onnx_path)
+    except Exception as e:
+        logger.error('Error loading YOLO ONNX model: %s', e)
+        _yolo_net = None
+    return _yolo_net
+
 def load_sentiment_analyzer():
     """Load sentiment analyzer for chat processing."""
     global _sentiment_analyzer
@@ -157,52 +359,71 @@ def load_sentiment_analyzer():
             logger.info('Sentiment analyzer loaded.')
             return _sentiment_analyzer
         except ImportError as e:
-            logger.error(f'Failed to import sentiment analyzer: {e}')
+            logger.error('Failed to import sentiment analyzer: %s', e)
             _sentiment_analyzer = None
         except Exception as e:
-            logger.error(f'Error loading sentiment analyzer: {e}')
+            logger.error('Error loading sentiment analyzer: %s', e)
             _sentiment_analyzer = None
     return _sentiment_analyzer
 
+def _get_flagged_cached(name, loader):
+    """Return a cached flagged-item lookup, reloading it once the TTL expires."""
+    with _flagged_cache_lock:
+        cached = _flagged_cache.get(name)
+        now = time.monotonic()
+        if cached and now - cached[0] < FLAGGED_CACHE_TTL:
+            return cached[1]
+        value = loader()
+        _flagged_cache[name] = (now, value)
+        return value
+
+def bust_keyword_cache():
+    """Drop cached flagged keywords/objects so the next lookup hits the database."""
+    with _flagged_cache_lock:
+        _flagged_cache.clear()
+
+def _load_flagged_keywords():
+    return [kw.keyword.lower() for kw in ChatKeyword.query.all()]
+
+def _load_flagged_objects():
+    objects = FlaggedObject.query.all()
+    return {obj.object_name.lower(): float(obj.confidence_threshold) for obj in objects}
+
 def refresh_flagged_keywords():
     """Get all flagged keywords from database."""
     try:
-        with current_app.app_context():
-            keywords = [kw.keyword.lower() for kw in ChatKeyword.query.all()]
+        keywords = _get_flagged_cached('keywords', _load_flagged_keywords)
+        get_keyword_matcher(keywords)
         return keywords
     except Exception as e:
-        logger.error(f'Error refreshing flagged keywords: {str(e)}')
+        logger.error('Error refreshing flagged keywords: %s', e)
         return []
 
 def refresh_flagged_objects():
     """Get all flagged objects from database."""
     try:
-        with current_app.app_context():
-            objects = FlaggedObject.query.all()
-            flagged = {obj.object_name.lower(): float(obj.confidence_threshold) for obj in objects}
-        return flagged
+        return _get_flagged_cached('objects', _load_flagged_objects)
     except Exception as e:
-        logger.error(f'Error refreshing flagged objects: {str(e)}')
+        logger.error('Error refreshing flagged objects: %s', e)
         return {}
 
 def get_m3u8_url(stream):
     """Get M3U8 URL for a stream."""
     try:
-        with current_app.app_context():
-            logger.debug(f'Fetching M3U8 URL for stream {stream.id} (type: {stream.type})')
-            if stream.type.lower() == 'chaturbate':
-                cb_stream = ChaturbateStream.query.get(stream.id)
-                url = cb_stream.chaturbate_m3u8_url if cb_stream else None
-                logger.debug(f'Chaturbate M3U8 URL: {url}')
-                return url
-            elif stream.type.lower() == 'stripchat':
-                sc_stream = StripchatStream.query.get(stream.id)
-                url = sc_stream.stripchat_m3u8_url if sc_stream else None
-                logger.debug(f'Stripchat M3U8 URL: {url}')
-                return url
+        logger.debug('Fetching M3U8 URL for stream %s (type: %s)', stream.id, stream.type)
+        if stream.type.lower() == 'chaturbate':
+            cb_stream = ChaturbateStream.query.get(stream.id)
+            url = cb_stream.chaturbate_m3u8_url if cb_stream else None
+            logger.debug('Chaturbate M3U8 URL: %s', url)
+            return url
+        elif stream.type.lower() == 'stripchat':
+            sc_stream = StripchatStream.query.get(stream.id)
+            url = sc_stream.stripchat_m3u8_url if sc_stream else None
+            logger.debug('Stripchat M3U8 URL: %s', url)
+            return url
         return None
     except Exception as e:
-        logger.error(f'Error getting M3U8 URL for stream {stream.id}: {str(e)}')
+        logger.error('Error getting M3U8 URL for stream %s: %s', stream.id, e)
         return None
 
 def fetch_all_agents():
@@ -212,106 +433,153 @@ def fetch_all_agents():
     if all_agents_fetched:
         return
         
-    try:
-        with current_app.app_context():
+    with _agent_fetch_lock:
+        if all_agents_fetched:
+            return
+        try:
             agents = User.query.filter_by(role='agent').all()
             agent_cache = {agent.id: agent.username or f'agent_{agent.id}' for agent in agents}
             all_agents_fetched = True
-            logger.info(f'Cached {len(agent_cache)} agent usernames.')
-    except Exception as e:
-        logger.error(f'Error fetching all agents: {str(e)}')
+            logger.info('Cached %s agent usernames.', len(agent_cache))
+        except Exception as e:
+            logger.error('Error fetching all agents: %s', e)
+
+def invalidate_agent_cache(*args):
+    """Mark the agent cache stale so the next lookup reloads it."""
+    global all_agents_fetched
+    all_agents_fetched = False
+
+for _event_name in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(User, _event_name, invalidate_agent_cache)
 
 def fetch_agent_username(agent_id):
     """Fetch an agent username by ID."""
-    if agent_id in agent_cache:
-        return agent_cache[agent_id]
-        
-    try:
-        with current_app.app_context():
-            agent = User.query.get(agent_id)
-            if agent:
-                username = agent.username or f'agent_{agent_id}'
-                agent_cache[agent_id] = username
-                return username
-            logger.warning(f'Agent {agent_id} not found.')
-            agent_cache[agent_id] = f'Agent {agent_id}'
-            return agent_cache[agent_id]
-    except Exception as e:
-        logger.error(f'Error fetching username for agent {agent_id}: {str(e)}')
-        agent_cache[agent_id] = f'Agent {agent_id}'
-        return agent_cache[agent_id]
+    if not all_agents_fetched:
+        fetch_all_agents()
+    return agent_cache.get(agent_id, f'Agent {agent_id}')
+
+def get_stream_status(stream_id):
+    """Return a stream's status, or _MISSING if the stream no longer exists.
+
+    Only the status column is selected, and results are cached for
+    STREAM_STATUS_TTL seconds.
+    """
+    now = time.monotonic()
+    cached = _stream_status_cache.get(stream_id)
+    if cached and now - cached[0] < STREAM_STATUS_TTL:
+        return cached[1]
+    row = db.session.query(Stream.status).filter(Stream.id == stream_id).first()
+    status = row[0] if row else _MISSING
+    _stream_status_cache[stream_id] = (now, status)
+    return status
+
+def invalidate_stream_status(mapper, connection, target):
+    """Drop the cached status of a stream whose row was written."""
+    _stream_status_cache.pop(target.id, None)
+    invalidate_online_streams()
+
+def invalidate_online_streams():
+    """Force the next get_online_streams call to query the database."""
+    _online_streams_cache['streams'] = None
+
+def get_online_streams(ttl=ONLINE_STREAMS_TTL):
+    """Return online streams, re-querying at most once per ttl seconds.
+
+    The cache holds detached snapshots; each call merges them into the
+    current session without emitting SQL.
+    """
+    now = time.monotonic()
+    cached = _online_streams_cache['streams']
+    if cached is None or now - _online_streams_cache['fetched_at'] >= ttl:
+        cached = db.session.query(STREAM_POLY).filter(
+            STREAM_POLY.status == 'online'
+        ).options(
+            selectinload(STREAM_POLY.assignments)
+        ).all()
+        for stream in cached:
+            db.session.expunge(stream)
+        _online_streams_cache.update(fetched_at=now, streams=cached)
+    return [db.session.merge(stream, load=False) for stream in cached]
+
+for _event_name in ('after_update', 'after_delete'):
+    event.listen(Stream, _event_name, invalidate_stream_status, propagate=True)
 
 def get_stream_info(stream_url):
     """Get platform and streamer info from stream URL."""
     try:
-        with current_app.app_context():
-            logger.debug(f'Looking up stream info for {stream_url}')
-            # Check room_url first
-            stream = Stream.query.filter_by(room_url=stream_url).first()
-            if stream:
-                logger.debug(f'Found stream by room_url: {stream_url}, type: {stream.type}, username: {stream.streamer_username}')
-                return stream.type.lower(), stream.streamer_username
-            
-            # Check for Chaturbate Stream URL
-            cb_stream = ChaturbateStream.query.filter_by(chaturbate_m3u8_url=stream_url).first()
-            if cb_stream:
-                stream = Stream.query.get(cb_stream.id)
-                logger.debug(f'Found stream by chaturbate_m3u8_url: {stream_url}, type: chaturbate, username: {stream.streamer_username if stream else "unknown"}')
-                return 'chaturbate', stream.streamer_username if stream else 'unknown'
-            
-            # Check for StripchatStream M3u8 URL
-            sc_stream = StripchatStream.query.filter_by(stripchat_m3u8_url=stream_url).first()
-            if sc_stream:
-                stream = Stream.query.get(sc_stream.id)
-                logger.debug(f'Found stream by stripchat_m3u8_url: {stream_url}, type: stripchat, username: {stream.streamer_username if stream else "unknown"}')
-                return 'stripchat', stream.streamer_username if stream else 'unknown'
+        logger.debug('Looking up stream info for %s', stream_url)
+        lookup = lookup_stream(stream_url)
+        if lookup:
+            logger.debug('Found stream for %s, type: %s, username: %s', stream_url, lookup.platform, lookup.streamer)
+            return lookup.platform, lookup.streamer
             
-            logger.warning(f'No stream found for {stream_url}.')
-            return 'unknown', 'unknown'
+        logger.warning('No stream found for %s.', stream_url)
+        return 'unknown', 'unknown'
     except Exception as e:
-        logger.error(f'Error getting stream info for {stream_url}: {str(e)}')
+        logger.error('Error getting stream info for %s: %s', stream_url, e)
         return 'unknown', 'unknown'
 
 def get_stream_assignment(stream_url):
     """Get assignment info for a stream."""
     try:
-        with current_app.app_context():
-            stream = Stream.query.filter_by(room_url=stream_url).first()
-            if not stream:
-                cb_stream = ChaturbateStream.query.filter_by(chaturbate_m3u8_url=stream_url).first()
-                if cb_stream:
-                    stream = Stream.query.get(cb_stream.id)
-                else:
-                    sc_stream = StripchatStream.query.filter_by(stripchat_m3u8_url=stream_url).first()
-                    if sc_stream:
-                        stream = Stream.query.get(sc_stream.id)
-                        
-            if not stream:
-                logger.warning(f'No stream found for {stream_url}.')
-                return None, None
-                
-            assignments = Assignment.query.options(
-                joinedload(Assignment.agent),
-                joinedload(Assignment.stream)
-            ).filter_by(stream_id=stream.id).all()
-            
-            if not assignments:
-                logger.info(f'No assignments found for stream: {stream_url}.')
-                return None, None
-                
-            assignment = assignments[0]
-            agent_id = assignment.agent_id
-            fetch_agent_username(agent_id)
-            return assignment.id, agent_id
+        lookup = lookup_stream(stream_url)
+        if not lookup:
+            logger.warning('No stream found for %s.', stream_url)
+            return None, None
+
+        if lookup.assignment_id is None:
+            logger.info('No assignments found for stream: %s.', stream_url)
+            return None, None
+
+        fetch_agent_username(lookup.agent_id)
+        return lookup.assignment_id, lookup.agent_id
     except Exception as e:
-        logger.error(f'Error getting stream assignment for {stream_url}: {str(e)}')
+        logger.error('Error getting stream assignment for %s: %s', stream_url, e)
         return None, None
 
+def _write_transcription(filepath, data):
+    """Write one transcription payload to disk."""
+    if orjson is not None:
+        buf = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        buf = json.dumps(data, indent=4, ensure_ascii=False).encode('utf-8')
+    fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(buf)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
+def _drain_transcriptions():
+    """Background writer that persists queued transcriptions off the audio hot path."""
+    os.makedirs(TRANSCRIPTION_DIR, exist_ok=True)
+    while True:
+        filepath, data = _transcription_q.get()
+        try:
+            _write_transcription(filepath, data)
+            logger.info('Saved transcription to %s.', filepath)
+        except Exception as e:
+            logger.error('Error saving transcription to JSON for %s: %s', data.get('stream_url'), e)
+
+def start_transcription_writer():
+    """Start the transcription writer greenlet if it is not already running."""
+    global _transcription_writer
+    if _transcription_writer is None or _transcription_writer.dead:
+        _transcription_writer = gevent.spawn(_drain_transcriptions)
+    return _transcription_writer
+
+def _url_hash(stream_url):
+    """Short non-cryptographic digest of a URL for use in filenames."""
+    if xxhash is not None:
+        return xxhash.xxh3_64_hexdigest(str(stream_url))[:8]
+    return hashlib.blake2b(str(stream_url).encode(), digest_size=4).hexdigest()
+
 def save_transcription_to_json(stream_url, transcript, detected_keywords):
-    """Save transcription data to a JSON file."""
+    """Queue transcription data to be saved to a JSON file."""
     try:
-        os.makedirs(TRANSCRIPTION_DIR, exist_ok=True)
-        url_hash = hashlib.md5(str(stream_url).encode()).hexdigest()[:8]
+        url_hash = _url_hash(stream_url)
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f'transcription_{url_hash}_{timestamp}.json'
         filepath = os.path.join(TRANSCRIPTION_DIR, filename)
@@ -323,44 +591,298 @@ def save_transcription_to_json(stream_url, transcript, detected_keywords):
             'detected_keywords': detected_keywords
         }
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-        logger.info(f'Saved transcription to {filepath}.')
+        start_transcription_writer()
+        _put_latest(_transcription_q, (filepath, data))
     except Exception as e:
-        logger.error(f'Error saving transcription to JSON for {stream_url}: {str(e)}')
+        logger.error('Error queueing transcription for %s: %s', stream_url, e)
+
+def check_stream_availability(stream_url, timeout=10, max_age=None):
+    """Check if a stream URL is accessible.
+
+    A probe result younger than max_age seconds (PROBE_CACHE_TTL by default)
+    is reused instead of probing again.
+    """
+    if max_age is None:
+        max_age = PROBE_CACHE_TTL
+    now = time.monotonic()
+    cached = _availability_cache.get(stream_url)
+    if cached and now - cached[0] < max_age:
+        _availability_cache.move_to_end(stream_url)
+        return cached[1]
 
-def check_stream_availability(stream_url, timeout=10):
-    """Check if a stream URL is accessible."""
     try:
-        response = requests.head(stream_url, timeout=timeout)
-        logger.info(f'Stream {stream_url} check: {response.status_code}')
-        return response.status_code == 200
+        if '.m3u8' in stream_url:
+            # Fetch only the head of the playlist: it is as cheap as a HEAD and also
+            # lets us reject error pages served with a 200
+            with _probe_session.get(stream_url, timeout=timeout, allow_redirects=False,
+                                    headers={'Range': f'bytes=0-{PROBE_RANGE_BYTES - 1}'}, stream=True) as response:
+                logger.info('Stream %s check: %s', stream_url, response.status_code)
+                available = response.status_code in (200, 206)
+                if available:
+                    head = response.raw.read(PROBE_RANGE_BYTES, decode_content=True)
+                    available = head.lstrip(b'\xef\xbb\xbf \t\r\n').startswith(b'#EXTM3U')
+                _drain_probe(response)
+        else:
+            response = _probe_session.head(stream_url, timeout=timeout, allow_redirects=False)
+            logger.info('Stream %s check: %s', stream_url, response.status_code)
+            available = response.status_code == 200
     except requests.exceptions.RequestException as e:
-        logger.error(f'Error checking stream availability for {stream_url}: {str(e)}')
-        return False
+        logger.error('Error checking stream availability for %s: %s', stream_url, e)
+        available = False
+
+    _availability_cache[stream_url] = (now, available)
+    _availability_cache.move_to_end(stream_url)
+    if len(_availability_cache) > PROBE_CACHE_SIZE:
+        _availability_cache.popitem(last=False)
+    return available
+
+def _drain_probe(response):
+    """Read up to PROBE_DRAIN_BYTES of what is left of a probe body so its connection is reused"""
+    remaining = PROBE_DRAIN_BYTES
+    while remaining > 0:
+        chunk = response.raw.read(min(remaining, 8192))
+        if not chunk:
+            return
+        remaining -= len(chunk)
+
+def queue_stream_update(stream_data):
+    """Buffer a stream update; updates for the same stream within a flush window coalesce."""
+    global _stream_update_flush
+    _stream_update_buffer.setdefault(stream_data['id'], {}).update(stream_data)
+    if _stream_update_flush is None:
+        _stream_update_flush = gevent.spawn_later(
+            STREAM_UPDATE_FLUSH_INTERVAL, _flush_stream_updates, current_app._get_current_object()
+        )
 
-def process_video_detection(app, stream_url, stream_id, room_url, streamer_username, cancel_event):
+def _flush_stream_updates(app):
+    """Broadcast every buffered stream update once."""
+    global _stream_update_flush
+    _stream_update_flush = None
+    updates = list(_stream_update_buffer.values())
+    _stream_update_buffer.clear()
+    with app.app_context():
+        emit_stream_updates(updates)
+
+def queue_admin_alert(**alert):
+    """Queue a NotificationService.notify_admins call for the background sender."""
+    start_admin_alert_sender(current_app._get_current_object())
+    _admin_alert_q.put(alert)
+
+def _drain_admin_alerts(app):
+    """Send queued admin alerts in batches, collapsing repeats within a batch."""
+    while True:
+        batch = [_admin_alert_q.get()]
+        while len(batch) < ADMIN_ALERT_BATCH_SIZE:
+            try:
+                batch.append(_admin_alert_q.get_nowait())
+            except Empty:
+                break
+        unique = {}
+        for alert in batch:
+            unique.setdefault((alert.get('event_type'), alert.get('streamer')), alert)
+        with app.app_context():
+            for alert in unique.values():
+                try:
+                    NotificationService.notify_admins(**alert)
+                except Exception as e:
+                    logger.error('Error notifying admins about %s: %s', alert.get('streamer'), e)
+                    db.session.rollback()
+
+def start_admin_alert_sender(app):
+    """Start the admin alert sender greenlet if it is not already running."""
+    global _admin_alert_sender
+    if _admin_alert_sender is None or _admin_alert_sender.dead:
+        _admin_alert_sender = gevent.spawn(_drain_admin_alerts, app)
+    return _admin_alert_sender
+
+def sanitize_chat_messages(messages):
+    """Strip emoticon floods and cap message length before sentiment analysis."""
+    sanitized = []
+    for msg in messages:
+        text = msg.get('message') or ''
+        if len(text) > MAX_CHAT_MESSAGE_LENGTH or len(EMOTICON_RE.findall(text)) > MAX_CHAT_EMOTICONS:
+            msg = dict(msg, message=EMOTICON_RE.sub(' ', text)[:MAX_CHAT_MESSAGE_LENGTH])
+        sanitized.append(msg)
+    return sanitized
+
+def _put_latest(queue, item):
+    """Enqueue item, dropping the oldest entry when the queue is full."""
+    try:
+        queue.put_nowait(item)
+    except Full:
+        try:
+            queue.get_nowait()
+        except Empty:
+            pass
+        queue.put_nowait(item)
+
+class DurationQueue(Queue):
+    """Packet queue holding at most max_seconds of media, dropping the oldest packets first.
+
+    Consumers that drain it periodically always see the most recent audio
+    instead of a backlog of stale packets.
+    """
+
+    def __init__(self, max_seconds, max_packets=None):
+        super().__init__()
+        self.max_seconds = max_seconds
+        self.max_packets = max_packets
+        self.seconds = 0.0
+
+    def _put(self, packet):
+        super()._put(packet)
+        self.seconds += _packet_seconds(packet)
+        while self.qsize() > 1 and (self.seconds > self.max_seconds or
+                                    (self.max_packets and self.qsize() > self.max_packets)):
+            self.seconds -= _packet_seconds(super()._get())
+
+    def _get(self):
+        packet = super()._get()
+        self.seconds -= _packet_seconds(packet)
+        return packet
+
+def _packet_seconds(packet):
+    """Duration of a packet in seconds, or 0 when the demuxer did not set one."""
+    if packet.duration and packet.time_base:
+        return float(packet.duration * packet.time_base)
+    return 0.0
+
+def _get_demux_threadpool():
+    """Return the native threadpool that runs blocking FFmpeg opens and reads."""
+    global _demux_threadpool
+    if _demux_threadpool is None:
+        _demux_threadpool = ThreadPool(DEMUX_THREADS)
+    return _demux_threadpool
+
+def _read_packets(packets):
+    """Pull the next batch of packets from a demux iterator; runs on a native thread.
+
+    Returns (batch, ended). A batch closes at DEMUX_BATCH_PACKETS packets or
+    DEMUX_BATCH_SECONDS after its first packet, so packets reach the
+    consumers while the rest of a segment is still being read.
+    """
+    batch = []
+    started = None
+    for packet in packets:
+        batch.append(packet)
+        if started is None:
+            started = time.monotonic()
+        if len(batch) >= DEMUX_BATCH_PACKETS or time.monotonic() - started >= DEMUX_BATCH_SECONDS:
+            return batch, False
+    return batch, True
+
+def _clear_queue(queue):
+    """Discard every item currently waiting in queue."""
+    while True:
+        try:
+            queue.get_nowait()
+        except Empty:
+            return
+
+def _demux_pump(app, stream_url, stream_id, media, cancel_event):
+    """Demux a stream once and route its packets to the video and audio consumers.
+
+    av.open and the packet reads block inside FFmpeg, which gevent cannot
+    patch, so they run on the demux threadpool while this greenlet waits
+    for each batch and routes it.
+    """
+    logger.info('Starting demux pump for %s (stream_id: %s)', stream_url, stream_id)
+    retry_delay = 10
+    max_empty_reopens = 3
+    empty_reopens = 0
+    threadpool = _get_demux_threadpool()
+
+    with app.app_context():
+        while not cancel_event.is_set():
+            container = None
+            offline = False
+            try:
+                container = threadpool.spawn(av.open, stream_url, timeout=60, options=HLS_INPUT_OPTIONS).get()
+                media['container'] = container
+                video_stream = next((s for s in container.streams if s.type == 'video'), None)
+                audio_stream = next((s for s in container.streams if s.type == 'audio'), None)
+                wanted = [s for s in (video_stream, audio_stream) if s is not None]
+
+                if not wanted:
+                    logger.warning('No audio or video stream found for %s', stream_url)
+                    cancel_event.wait(timeout=retry_delay)
+                    continue
+
+                if video_stream:
+                    # Only keyframes are needed for periodic sampling
+                    video_stream.codec_context.skip_frame = 'NONKEY'
+
+                routed = 0
+                packets = container.demux(*wanted)
+                ended = False
+                while not ended and not cancel_event.is_set():
+                    batch, ended = threadpool.spawn(_read_packets, packets).get()
+                    for packet in batch:
+                        if packet.dts is None:
+                            continue
+                        if packet.stream.type == 'video':
+                            if packet.is_keyframe:
+                                _put_latest(media['video_q'], packet)
+                                routed += 1
+                        else:
+                            _put_latest(media['audio_q'], packet)
+                            routed += 1
+
+                if not cancel_event.is_set():
+                    # The playlist ended without EOFError; reopening straight away would spin, and
+                    # repeated passes that yield nothing mean the stream has gone offline
+                    empty_reopens = empty_reopens + 1 if routed == 0 else 0
+                    if empty_reopens >= max_empty_reopens:
+                        logger.info('Stream %s yielded no packets after %s reopens.', stream_url, empty_reopens)
+                        offline = True
+                    else:
+                        cancel_event.wait(timeout=retry_delay)
+
+            except av.error.EOFError:
+                offline = True
+            except Exception as e:
+                logger.error('Error demuxing stream %s: %s', stream_url, e)
+                cancel_event.wait(timeout=retry_delay)
+            finally:
+                # Packets reference the container's buffers, so consumers must not decode them after close
+                _clear_queue(media['video_q'])
+                _clear_queue(media['audio_q'])
+                if container is not None:
+                    container.close()
+                media['container'] = None
+
+            if offline:
+                stream = Stream.query.get(stream_id)
+                if stream:
+                    stream.status = 'offline'
+                    db.session.commit()
+                    stop_monitoring(stream)
+                break
+
+        logger.info('Stopped demux pump for %s.', stream_url)
+
+def process_video_detection(app, stream_url, stream_id, room_url, streamer_username, cancel_event, video_q):
     """Process video detection for a stream in a separate greenlet."""
-    logger.info(f'Starting video detection for {stream_url} (stream_id: {stream_id})')
+    logger.info('Starting video detection for %s (stream_id: %s)', stream_url, stream_id)
     max_retries = 3
     retry_delay = 10
-    frame_process_times = {}
+    last_process_time = None
     video_interval = float(os.getenv('VIDEO_INTERVAL', '30'))
+    reformatter = VideoReformatter()
 
     with app.app_context():
         while not cancel_event.is_set():
             try:
-                stream = Stream.query.get(stream_id)
-                if not stream:
-                    logger.error(f'Stream with ID {stream_id} no longer exists.')
+                status = get_stream_status(stream_id)
+                if status is _MISSING:
+                    logger.error('Stream with ID %s no longer exists.', stream_id)
                     break
-                db.session.refresh(stream)
-                if stream.status == 'offline':
-                    logger.info(f'Stopping video monitoring for offline stream: {stream.id}.')
-                    stop_monitoring(stream)
+                if status == 'offline':
+                    logger.info('Stopping video monitoring for offline stream: %s.', stream_id)
+                    stop_monitoring(Stream.query.get(stream_id))
                     break
             except Exception as e:
-                logger.error(f'Error refreshing stream {stream_id} for video monitoring: {str(e)}')
+                logger.error('Error refreshing stream %s for video monitoring: %s', stream_id, e)
                 break
 
             retry_count = 0
@@ -371,91 +893,91 @@ def process_video_detection(app, stream_url, stream_id, room_url, streamer_usern
                     stream_available = True
                     break
                 retry_count += 1
-                logger.warning(f'Stream {stream_url} unavailable, retry {retry_count}/{max_retries}.')
-                gevent.sleep(retry_delay)
+                logger.warning('Stream %s unavailable, retry %s/%s.', stream_url, retry_count, max_retries)
+                cancel_event.wait(timeout=retry_delay)
 
             if not stream_available:
-                logger.error(f'Stream {stream_url} is offline after {max_retries} retries.')
+                logger.error('Stream %s is offline after %s retries.', stream_url, max_retries)
                 stream = Stream.query.get(stream_id)
                 if stream:
-                    with app.app_context():
-                        stream.status = 'offline'
-                        db.session.commit()
+                    stream.status = 'offline'
+                    db.session.commit()
                     stop_monitoring(stream)
                 break
 
             try:
-                video_container = av.open(stream_url, timeout=60)
-                video_stream = next((s for s in video_container.streams if s.type == 'video'), None)
+                packets = [video_q.get(timeout=video_interval)]
+            except Empty:
+                logger.warning('No video keyframes received for %s', stream_url)
+                continue
+            while not video_q.empty():
+                packets.append(video_q.get_nowait())
 
-                if video_stream:
-                    for packet in video_container.demux(video_stream):
-                        if cancel_event.is_set():
-                            break
-                        try:
-                            for frame in packet.decode():
-                                frame_time = frame.pts * float(video_stream.time_base)
-                                last_process_time = frame_process_times.get(stream_url, 0)
-
-                                if last_process_time is None or frame_time - last_process_time >= video_interval:
-                                    img = frame.to_ndarray(format='bgr24')
-                                    img = cv2.resize(img, (640, 480))
-
-                                    detections = process_video_frame(img, stream_url)
-                                    if detections:
-                                        log_video_detection(detections, img, stream_url)
-
-                                    frame_process_times[stream_url] = frame_time
-                                    break  # Process one frame per interval
-                            break  # Exit after processing one packet
-                        except av.error.InvalidDataError:
-                            logger.debug(f'Invalid video data for {stream_url}, skipping packet.')
-                            continue
-                        except Exception as e:
-                            logger.error(f'Error decoding video packet for {stream_url}: {str(e)}')
-                            continue
-                    video_container.close()
-                else:
-                    logger.warning(f'No video stream found for {stream_url}')
-                    gevent.sleep(video_interval)
+            try:
+                frame = None
+                for packet in packets:
+                    try:
+                        for decoded in packet.decode():
+                            if decoded.pts is not None:
+                                frame = decoded
+                                time_base = float(packet.stream.time_base)
+                    except av.error.InvalidDataError:
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug('Invalid video data for %s, skipping packet.', stream_url)
+                        continue
+                    except Exception as e:
+                        logger.error('Error decoding video packet for %s: %s', stream_url, e)
+                        continue
 
-            except av.error.EOFError:
-                stream = Stream.query.get(stream_id)
-                if stream:
-                    stream.status = 'offline'
-                    db.session.commit()
-                    stop_monitoring(stream)
-                break
+                if frame is not None:
+                    frame_time = frame.pts * time_base
+                    if last_process_time is None or frame_time - last_process_time >= video_interval:
+                        # Colorspace conversion and downscale fused into one swscale pass
+                        img = reformatter.reformat(frame, width=640, height=480, format='bgr24').to_ndarray()
+
+                        detections = process_video_frame(img, stream_url)
+                        if detections:
+                            log_video_detection(detections, img, stream_url)
+
+                        last_process_time = frame_time
             except Exception as e:
-                logger.error(f'Error opening video stream {stream_url}: {str(e)}')
-                gevent.sleep(retry_delay)
+                logger.error('Error processing video for %s: %s', stream_url, e)
+                cancel_event.wait(timeout=retry_delay)
                 continue
 
-            gevent.sleep(video_interval)
+            cancel_event.wait(timeout=video_interval)
 
-        logger.info(f'Stopped video monitoring for {stream_url}.')
+        logger.info('Stopped video monitoring for %s.', stream_url)
 
-def process_audio_detection(app, stream_url, stream_id, room_url, streamer_username, cancel_event):
+def process_audio_detection(app, stream_url, stream_id, room_url, streamer_username, cancel_event, audio_q):
     """Process audio detection for a stream in a separate greenlet."""
-    logger.info(f'Starting audio detection for {stream_url} (stream_id: {stream_id})')
+    logger.info('Starting audio detection for %s (stream_id: %s)', stream_url, stream_id)
     audio_interval = float(os.getenv('AUDIO_DETECTION_INTERVAL', 30))
     max_retries = 3
     retry_delay = 10
 
     with app.app_context():
+        # Decoded frames are converted straight to 16 kHz mono float32 and written
+        # into one preallocated segment buffer, reused for every segment
+        sample_duration = current_app.config.get('AUDIO_SAMPLE_DURATION', 30)
+        segment_samples = int(WHISPER_SAMPLE_RATE * sample_duration)
+        ring = np.empty(segment_samples, dtype=np.float32)
+        resampler = av.AudioResampler(format='flt', layout='mono', rate=WHISPER_SAMPLE_RATE)
+        platform, streamer = get_stream_info(room_url)
+        info_resolved_at = time.monotonic()
+
         while not cancel_event.is_set():
             try:
-                stream = Stream.query.get(stream_id)
-                if not stream:
-                    logger.error(f'Stream with ID {stream_id} no longer exists.')
+                status = get_stream_status(stream_id)
+                if status is _MISSING:
+                    logger.error('Stream with ID %s no longer exists.', stream_id)
                     break
-                db.session.refresh(stream)
-                if stream.status == 'offline':
-                    logger.info(f'Stopping audio monitoring for offline stream: {stream.id}.')
-                    stop_monitoring(stream)
+                if status == 'offline':
+                    logger.info('Stopping audio monitoring for offline stream: %s.', stream_id)
+                    stop_monitoring(Stream.query.get(stream_id))
                     break
             except Exception as e:
-                logger.error(f'Error refreshing stream {stream_id} for audio processing: {str(e)}')
+                logger.error('Error refreshing stream %s for audio processing: %s', stream_id, e)
                 break
 
             retry_count = 0
@@ -466,11 +988,11 @@ def process_audio_detection(app, stream_url, stream_id, room_url, streamer_usern
                     stream_available = True
                     break
                 retry_count += 1
-                logger.warning(f'Stream {stream_url} unavailable, retry {retry_count}/{max_retries}.')
-                gevent.sleep(retry_delay)
+                logger.warning('Stream %s unavailable, retry %s/%s.', stream_url, retry_count, max_retries)
+                cancel_event.wait(timeout=retry_delay)
 
             if not stream_available:
-                logger.error(f'Stream {stream_url} is offline after {max_retries} retries.')
+                logger.error('Stream %s is offline after %s retries.', stream_url, max_retries)
                 stream = Stream.query.get(stream_id)
                 if stream:
                     stream.status = 'offline'
@@ -479,152 +1001,225 @@ def process_audio_detection(app, stream_url, stream_id, room_url, streamer_usern
                 break
 
             try:
-                audio_container = av.open(stream_url, timeout=60)
-                audio_stream = next((s for s in audio_container.streams if s.type == 'audio'), None)
-
-                if audio_stream:
-                    audio_buffer = []
-                    total_audio_duration = 0
-                    sample_rate = audio_stream.rate if audio_stream else 16000
-
-                    for packet in audio_container.demux(audio_stream):
-                        if cancel_event.is_set():
-                            break
-                        try:
-                            for frame in packet.decode():
-                                audio_data = frame.to_ndarray().flatten().astype(np.float32) / 32768.0
-                                frame_duration = frame.samples / sample_rate
-                                audio_buffer.append(audio_data)
-                                total_audio_duration += frame_duration
-
-                                if total_audio_duration >= current_app.config.get('AUDIO_SAMPLE_DURATION', 30):
-                                    combined_audio = np.concatenate(audio_buffer)
-                                    detections, transcript = process_audio_segment(combined_audio, sample_rate, stream_url)
-
-                                    detected_keywords = []
-                                    if transcript:
-                                        keywords = refresh_flagged_keywords()
-                                        detected_keywords = [kw for kw in keywords if kw in transcript.lower()]
-                                        if detected_keywords:
-                                            logger.info(f'Keywords detected in audio for {stream_url}: {detected_keywords}')
-
-                                    save_transcription_to_json(stream_url, transcript, detected_keywords)
-
-                                    if detections:
-                                        for detection in detections:
-                                            log_audio_detection(detection, stream_url)
-                                            platform, streamer = get_stream_info(room_url)
-                                            notification_data = {
-                                                'event_type': 'audio_keyword_alert',
-                                                'timestamp': detection['timestamp'],
-                                                'details': {
-                                                    'keyword': detection['keyword'],
-                                                    'transcript': transcript,
-                                                    'streamer_name': streamer,
-                                                    'platform': platform,
-                                                    'stream_url': stream_url
-                                                },
-                                                'read': False,
-                                                'room_url': room_url,
-                                                'streamer': streamer,
-                                                'platform': platform,
-                                                'assigned_agent': 'Unassigned'
-                                            }
-                                            emit_notification(notification_data)
-
-                                    audio_buffer = []
-                                    total_audio_duration = 0
-                                    break
-                            break
-                        except Exception as e:
-                            logger.error(f'Error processing audio frame for {stream_url}: {str(e)}')
-                            continue
-                    audio_container.close()
-                else:
-                    logger.warning(f'No audio stream found for {stream_url}')
-                    gevent.sleep(audio_interval)
-
-            except av.error.OSError as e:
-                logger.error(f'OS error opening audio stream {stream_url}: {str(e)}')
-                gevent.sleep(retry_delay)
-            except Exception as e:
-                logger.error(f'Error opening audio stream {stream_url}: {str(e)}')
-                gevent.sleep(retry_delay)
-
-            gevent.sleep(audio_interval)
+                write = 0
+                while write < segment_samples and not cancel_event.is_set():
+                    try:
+                        packet = audio_q.get(timeout=retry_delay)
+                    except Empty:
+                        logger.warning('No audio packets received for %s', stream_url)
+                        break
+                    try:
+                        for frame in packet.decode():
+                            for resampled in resampler.resample(frame):
+                                n = min(resampled.samples, segment_samples - write)
+                                ring[write:write + n] = np.frombuffer(resampled.planes[0], dtype=np.float32, count=n)
+                                write += n
+                    except Exception as e:
+                        logger.error('Error processing audio frame for %s: %s', stream_url, e)
+                        continue
 
-        logger.info(f'Stopped audio monitoring for {stream_url}.')
+                if write >= segment_samples:
+                    detections, transcript = process_audio_segment(ring[:write], WHISPER_SAMPLE_RATE, stream_url)
+
+                    detected_keywords = []
+                    if transcript:
+                        keywords = refresh_flagged_keywords()
+                        detected_keywords = match_flagged_keywords(transcript, keywords)
+                        if detected_keywords:
+                            logger.info('Keywords detected in audio for %s: %s', stream_url, detected_keywords)
+
+                    save_transcription_to_json(stream_url, transcript, detected_keywords)
+
+                    if detections:
+                        if time.monotonic() - info_resolved_at > STREAM_INFO_REFRESH:
+                            platform, streamer = get_stream_info(room_url)
+                            info_resolved_at = time.monotonic()
+                        pending = []
+                        for detection in detections:
+                            log_audio_detection(detection, stream_url)
+                            pending.append({
+                                'event_type': 'audio_keyword_alert',
+                                'timestamp': detection['timestamp'],
+                                'details': {
+                                    'keyword': detection['keyword'],
+                                    'transcript': transcript,
+                                    'streamer_name': streamer,
+                                    'platform': platform,
+                                    'stream_url': stream_url
+                                },
+                                'read': False,
+                                'room_url': room_url,
+                                'streamer': streamer,
+                                'platform': platform,
+                                'assigned_agent': 'Unassigned'
+                            })
+                        emit_notification_batch(pending)
 
-def process_chat_detection(app, room_url, stream_id, streamer_username, cancel_event):
-    """Process chat detection for a stream in a separate greenlet."""
-    logger.info(f'Starting chat detection for {room_url} (stream_id: {stream_id})')
+            except Exception as e:
+                logger.error('Error processing audio for %s: %s', stream_url, e)
+                cancel_event.wait(timeout=retry_delay)
+
+            cancel_event.wait(timeout=audio_interval)
+
+        logger.info('Stopped audio monitoring for %s.', stream_url)
+
+def _chat_alert_payload(detection, room_url, streamer_username, platform):
+    """Build the chat_alert notification for one chat detection."""
+    return {
+        'event_type': 'chat_alert',
+        'timestamp': datetime.now().isoformat(),
+        'details': {
+            'type': detection.get('type'),
+            'message': detection.get('message'),
+            'username': detection.get('username'),
+            'streamer_name': streamer_username,
+            'platform': platform,
+            'room_url': room_url,
+            'stream_url': room_url
+        },
+        'read': False,
+        'room_url': room_url,
+        'streamer': streamer_username,
+        'platform': platform,
+        'assigned_agent': 'Unassigned'
+    }
+
+def process_chat_detection(app, room_url, stream_id, streamer_username, platform):
+    """Run one chat detection pass for a stream.
+
+    Returns the delay in seconds until the next pass, or None if monitoring
+    of the stream should stop.
+    """
     chat_interval = float(os.getenv('CHAT_DETECTION_INTERVAL', 30))
 
     with app.app_context():
-        while not cancel_event.is_set():
-            try:
-                stream = Stream.query.get(stream_id)
-                if not stream:
-                    logger.error(f'Stream with ID {stream_id} no longer exists.')
-                    break
-                db.session.refresh(stream)
-                if stream.status == 'offline':
-                    logger.info(f'Stopping chat monitoring for offline stream: {stream.id}.')
-                    stop_monitoring(stream)
-                    break
-            except Exception as e:
-                logger.error(f'Error refreshing stream {stream_id} for chat monitoring: {str(e)}')
-                break
+        try:
+            status = get_stream_status(stream_id)
+            if status is _MISSING:
+                logger.error('Stream with ID %s no longer exists.', stream_id)
+                return None
+            if status == 'offline':
+                logger.info('Stopping chat monitoring for offline stream: %s.', stream_id)
+                stop_monitoring(Stream.query.get(stream_id))
+                return None
+        except Exception as e:
+            logger.error('Error refreshing stream %s for chat monitoring: %s', stream_id, e)
+            return None
 
-            try:
-                logger.debug(f'Fetching chat messages for {streamer_username} at {room_url}.')
-                messages = fetch_chat_messages(room_url)
+        try:
+            logger.debug('Fetching chat messages for %s at %s.', streamer_username, room_url)
+            messages = fetch_chat_messages(room_url)
+
+            if messages:
+                logger.debug('Processing %s chat messages for %s.', len(messages), streamer_username)
+                chat_detections = process_chat_messages(sanitize_chat_messages(messages), room_url)
+
+                if chat_detections:
+                    logger.info('Detected %s chat issues for %s.', len(chat_detections), streamer_username)
+                    log_chat_detection(chat_detections, room_url)
+
+                    emit_notification_batch([
+                        _chat_alert_payload(detection, room_url, streamer_username, platform)
+                        for detection in chat_detections
+                    ])
+            else:
+                logger.debug('No chat messages fetched for %s at %s.', streamer_username, room_url)
+        except Exception as e:
+            logger.error('Error processing chat for %s (%s): %s', streamer_username, room_url, e)
+            return CHAT_ERROR_BACKOFF + chat_interval
 
-                if messages:
-                    logger.debug(f'Processing {len(messages)} chat messages for {streamer_username}.')
-                    chat_detections = process_chat_messages(messages, room_url)
+    return chat_interval
 
-                    if chat_detections:
-                        logger.info(f'Detected {len(chat_detections)} chat issues for {streamer_username}.')
-                        log_chat_detection(chat_detections, room_url)
+def schedule_stream_task(stream_id, kind, delay=0.0):
+    """Queue a periodic task for a monitored stream on the shared scheduler."""
+    heapq.heappush(_schedule, (time.monotonic() + delay, next(_schedule_seq), stream_id, kind))
+    _schedule_wakeup.set()
 
-                        for detection in chat_detections:
-                            notification_data = {
-                                'event_type': 'chat_alert',
-                                'timestamp': datetime.now().isoformat(),
-                                'details': {
-                                    'type': detection.get('type'),
-                                    'message': detection.get('message'),
-                                    'username': detection.get('username'),
-                                    'streamer_name': streamer_username,
-                                    'platform': stream.type.lower(),
-                                    'room_url': room_url,
-                                    'stream_url': stream.room_url
-                                },
-                                'read': False,
-                                'room_url': room_url,
-                                'streamer': streamer_username,
-                                'platform': stream.type.lower(),
-                                'assigned_agent': 'Unassigned'
-                            }
-                            emit_notification(notification_data)
-                else:
-                    logger.debug(f'No chat messages fetched for {streamer_username} at {room_url}.')
-            except Exception as e:
-                logger.error(f'Error processing chat for {streamer_username} ({room_url}): {str(e)}')
-                gevent.sleep(10)
+def unschedule_stream_tasks(stream_id):
+    """Drop all pending scheduler entries for a stream."""
+    _schedule[:] = [entry for entry in _schedule if entry[2] != stream_id]
+    heapq.heapify(_schedule)
+    _schedule_wakeup.set()
 
-            gevent.sleep(chat_interval)
-
-        logger.info(f'Stopped chat monitoring for {room_url}.')
+def _run_stream_task(media, stream_id, kind):
+    """Run one scheduled task and queue its next firing."""
+    delay = None
+    try:
+        if kind == 'chat':
+            delay = process_chat_detection(*media['chat_args'])
+    except Exception as e:
+        logger.error('Error running scheduled %s task for stream %s: %s', kind, stream_id, e)
+    if delay is not None and not media['cancel'].is_set() and stream_processors.get(stream_id) is media:
+        schedule_stream_task(stream_id, kind, delay)
+
+def register_periodic_task(name, func, interval, *args, delay=0.0):
+    """Run func(*args) every interval seconds from the shared scheduler.
+
+    The next run is queued only after the previous one finishes, so a slow
+    pass is never overlapped by the next.
+    """
+    _periodic_tasks[name] = (func, interval, args)
+    heapq.heappush(_schedule, (time.monotonic() + delay, next(_schedule_seq), None, name))
+    _schedule_wakeup.set()
+    start_scheduler()
+
+def _run_periodic_task(name):
+    """Run one registered periodic task and queue its next firing."""
+    func, interval, args = _periodic_tasks[name]
+    try:
+        func(*args)
+    except Exception as e:
+        logger.error('Error in periodic task %s: %s', name, e)
+    if _periodic_tasks.get(name, (None,))[0] is func:
+        heapq.heappush(_schedule, (time.monotonic() + interval, next(_schedule_seq), None, name))
+        _schedule_wakeup.set()
+
+def _run_scheduler():
+    """Fire due per-stream and periodic tasks from the schedule heap.
+
+    Per-stream passes share the bounded gevent pool. Periodic tasks get their
+    own greenlet: they can start monitoring, and waiting on the pool from
+    inside it would deadlock once it fills.
+    """
+    while True:
+        _schedule_wakeup.clear()
+        if not _schedule:
+            _schedule_wakeup.wait()
+            continue
+        fire_at = _schedule[0][0]
+        wait = fire_at - time.monotonic()
+        if wait > 0:
+            # Woken early when an earlier entry is pushed or a stream is unscheduled
+            _schedule_wakeup.wait(timeout=wait)
+            continue
+        _, _, stream_id, kind = heapq.heappop(_schedule)
+        if stream_id is None:
+            if kind in _periodic_tasks:
+                gevent.spawn(_run_periodic_task, kind)
+            continue
+        media = stream_processors.get(stream_id)
+        if not media or media['cancel'].is_set():
+            continue
+        media[f'{kind}_task'] = gevent_pool.spawn(_run_stream_task, media, stream_id, kind)
+
+def start_scheduler():
+    """Start the scheduler greenlet if it is not already running."""
+    global _scheduler_task
+    if _scheduler_task is None or _scheduler_task.dead:
+        _scheduler_task = gevent.spawn(_run_scheduler)
+    return _scheduler_task
 
 def get_stream_url(stream):
     """Get the appropriate stream URL for monitoring."""
     m3u8_url = get_m3u8_url(stream)
     return m3u8_url if m3u8_url else stream.room_url
 
-def start_monitoring(stream):
-    """Start monitoring a stream with separate video, audio, and chat detection."""
+def start_monitoring(stream, persist=True):
+    """Start monitoring a stream with separate video, audio, and chat detection.
+
+    With persist=False the stream row is left untouched so the caller can
+    write the new status in bulk.
+    """
     try:
         stream_id = stream.id
         stream_url = get_m3u8_url(stream)  # Use M3U8 for video/audio
@@ -632,14 +1227,14 @@ def start_monitoring(stream):
         streamer_username = stream.streamer_username
         
         if not stream_url or not room_url:
-            logger.error(f'No valid URLs for stream {stream_id} - {streamer_username}: stream_url={stream_url}, room_url={room_url}')
+            logger.error('No valid URLs for stream %s - %s: stream_url=%s, room_url=%s', stream_id, streamer_username, stream_url, room_url)
             return False
             
-        if stream_url in stream_processors:
-            logger.info(f'Stream {stream_id} - {streamer_username} is already being monitored.')
+        if stream_id in stream_processors:
+            logger.info('Stream %s - %s is already being monitored.', stream_id, streamer_username)
             return True
             
-        logger.info(f'Starting monitoring for stream {stream_id} - {streamer_username} at stream_url={stream_url}, room_url={room_url}')
+        logger.info('Starting monitoring for stream %s - %s at stream_url=%s, room_url=%s', stream_id, streamer_username, stream_url, room_url)
         
         app = current_app._get_current_object()
         cancel_event = gevent.event.Event()
@@ -649,65 +1244,83 @@ def start_monitoring(stream):
         enable_audio_monitoring = os.getenv('ENABLE_AUDIO_MONITORING', 'true').lower() == 'true'
         enable_chat_monitoring = os.getenv('ENABLE_CHAT_MONITORING', 'true').lower() == 'true'
         
-        video_task = None
-        audio_task = None
-        chat_task = None
+        media = {
+            'stream_url': stream_url,
+            'cancel': cancel_event,
+            'container': None,
+            'video_q': Queue(maxsize=VIDEO_PACKET_QUEUE_SIZE),
+            'audio_q': DurationQueue(
+                float(AUDIO_QUEUE_SECONDS or current_app.config.get('AUDIO_SAMPLE_DURATION', 30)),
+                max_packets=AUDIO_PACKET_QUEUE_SIZE
+            ),
+            'demux_task': None,
+            'video_task': None,
+            'audio_task': None,
+            'chat_task': None
+        }
         
+        # One shared demuxer feeds the video and audio consumers. These workers live as
+        # long as the stream, so they stay off the bounded pool used for scheduled passes
+        if enable_video_monitoring or enable_audio_monitoring:
+            media['demux_task'] = gevent.spawn(
+                _demux_pump,
+                app,
+                stream_url,
+                stream_id,
+                media,
+                cancel_event
+            )
         if enable_video_monitoring:
-            video_task = gevent_pool.spawn(
+            media['video_task'] = gevent.spawn(
                 process_video_detection,
                 app,
                 stream_url,
                 stream_id,
                 room_url,
                 streamer_username,
-                cancel_event
+                cancel_event,
+                media['video_q']
             )
         if enable_audio_monitoring:
-            audio_task = gevent_pool.spawn(
+            media['audio_task'] = gevent.spawn(
                 process_audio_detection,
                 app,
                 stream_url,
                 stream_id,
                 room_url,
                 streamer_username,
-                cancel_event
+                cancel_event,
+                media['audio_q']
             )
+        stream_processors.register(stream_id, media)
         if enable_chat_monitoring:
-            chat_task = gevent_pool.spawn(
-                process_chat_detection,
-                app,
-                room_url,
-                stream_id,
-                streamer_username,
-                cancel_event
-            )
+            media['chat_args'] = (app, room_url, stream_id, streamer_username, stream.type.lower())
+            logger.info('Scheduling chat detection for %s (stream_id: %s)', room_url, stream_id)
+            start_scheduler()
+            schedule_stream_task(stream_id, 'chat')
         
-        stream_processors[stream_url] = (cancel_event, video_task, audio_task, chat_task)
-        
-        with app.app_context():
-            try:
-                stream = Stream.query.get(stream_id)
-                if stream:
-                    stream.is_monitored = True
-                    stream.status = 'monitoring'
-                    db.session.commit()
-                    emit_stream_update({
-                        'id': stream.id,
-                        'url': stream.room_url,
-                        'status': 'monitoring',
-                        'type': stream.type,
-                        'isDetecting': True
-                    })
-            except Exception as e:
-                logger.error(f'Failed to update stream status for {stream_id}: {str(e)}')
+        try:
+            stream = Stream.query.get(stream_id) if persist else None
+            if stream:
+                stream.is_monitored = True
+                stream.status = 'monitoring'
+                db.session.commit()
+                queue_stream_update({
+                    'id': stream.id,
+                    'url': stream.room_url,
+                    'status': 'monitoring',
+                    'type': stream.type,
+                    'isDetecting': True
+                })
+        except Exception as e:
+            logger.error('Failed to update stream status for %s: %s', stream_id, e)
                 
-            logger.info(f'Monitoring started for stream {stream_id} - {streamer_username}: '
-                        f'video={enable_video_monitoring}, audio={enable_audio_monitoring}, chat={enable_chat_monitoring}')
-            return True
+        logger.info('Monitoring started for stream %s - %s: video=%s, audio=%s, chat=%s',
+                    stream_id, streamer_username, enable_video_monitoring, enable_audio_monitoring, enable_chat_monitoring)
+        return True
             
     except Exception as e:
-        logger.error(f'Error starting monitoring for stream {stream_id}: {str(e)}')
+        logger.error('Error starting monitoring for stream %s: %s', stream_id, e)
         return False
 
 def stop_monitoring(stream):
@@ -718,44 +1331,39 @@ def stop_monitoring(stream):
         
     try:
         stream_id = stream.id
-        stream_url = get_m3u8_url(stream) or stream.room_url
+        media = stream_processors.pop(stream_id, None)
+        stream_url = media['stream_url'] if media else stream.room_url
         
-        with current_app.app_context():
-            try:
-                stream = Stream.query.get(stream_id)
-                if stream:
-                    stream.is_monitored = False
-                    stream.status = 'offline'
-                    db.session.commit()
-            except Exception as e:
-                logger.error(f'Failed to update stream status for {stream_id}: {str(e)}')
+        try:
+            stream = Stream.query.get(stream_id)
+            if stream:
+                stream.is_monitored = False
+                stream.status = 'offline'
+                db.session.commit()
+        except Exception as e:
+            logger.error('Failed to update stream status for %s: %s', stream_id, e)
                 
-        if stream_url in stream_processors:
+        if media:
             try:
-                cancel_event, video_task, audio_task, chat_task = stream_processors.get(stream_url, (None, None, None, None))
-                if cancel_event:
-                    cancel_event.set()
-                if video_task:
-                    gevent.joinall([video_task], timeout=2.0)
-                if audio_task:
-                    gevent.joinall([audio_task], timeout=2.0)
-                if chat_task:
-                    gevent.joinall([chat_task], timeout=2.0)
-                del stream_processors[stream_url]
+                media['cancel'].set()
+                unschedule_stream_tasks(stream_id)
+                # Tasks wake on the cancel event, so they are joined together under one timeout
+                current = gevent.getcurrent()
+                tasks = [media[key] for key in ('video_task', 'audio_task', 'chat_task', 'demux_task')
+                         if media[key] and media[key] is not current]
+                gevent.joinall(tasks, timeout=2.0, raise_error=False)
             except Exception as e:
-                logger.error(f'Error cleaning up stream_processors for {stream_url}: {str(e)}')
+                logger.error('Error cleaning up stream_processors for %s: %s', stream_url, e)
                 
-        from video_processing import cleanup_video_resources
-        from audio_processing import cleanup_audio_resources
         try:
             cleanup_video_resources()
             cleanup_audio_resources()
         except Exception as e:
-            logger.error(f'Error cleaning up video/audio resources for stream {stream.id}: {str(e)}')
+            logger.error('Error cleaning up video/audio resources for stream %s: %s', stream.id, e)
             
-        logger.info(f'Stopped monitoring for stream: {stream.id}.')
+        logger.info('Stopped monitoring for stream: %s.', stream.id)
         try:
-            emit_stream_update({
+            queue_stream_update({
                 'id': stream.id,
                 'url': stream_url,
                 'status': 'stopped',
@@ -763,85 +1371,142 @@ def stop_monitoring(stream):
                 'isDetecting': False
             })
         except Exception as e:
-            logger.error(f'Error emitting stream update for {stream_url}: {str(e)}')
+            logger.error('Error emitting stream update for %s: %s', stream_url, e)
             
     except Exception as e:
-        logger.error(f'Error stopping monitoring for stream {stream.id}: {str(e)}')
+        logger.error('Error stopping monitoring for stream %s: %s', stream.id, e)
+
+def stop_monitoring_by_id(stream_id):
+    """Stop monitoring the stream with the given id."""
+    stream = Stream.query.get(stream_id)
+    if not stream:
+        logger.warning('Stream %s not found; nothing to stop.', stream_id)
+        return
+    stop_monitoring(stream)
 
 def fetch_new_streams_from_platforms():
     """Fetch new or unmonitored streams from the database."""
     try:
-        with current_app.app_context():
-            # Use with_polymorphic to fetch Stream and its subclasses (ChaturbateStream, StripchatStream)
-            stream_types = with_polymorphic(Stream, [ChaturbateStream, StripchatStream])
-            streams = Stream.query.with_polymorphic([ChaturbateStream, StripchatStream]).filter(
-                Stream.status == 'online',
-                Stream.is_monitored == False
-            ).options(
-                joinedload(stream_types.assignments)
-            ).all()
+        streams = [stream for stream in get_online_streams() if not stream.is_monitored]
             
-            logger.info(f'Found {len(streams)} new or unmonitored online streams.')
+        logger.info('Found %s new or unmonitored online streams.', len(streams))
+        
+        # Read the payload fields now; the commit below expires the instances
+        snapshots = [
+            (stream.id, stream.room_url, stream.type, stream.streamer_username, stream.status, stream.is_monitored)
+            for stream in streams
+        ]
             
-            for stream in streams:
-                try:
-                    logger.debug(f'Processing stream {stream.id} - {stream.streamer_username}: type={stream.type}, status={stream.status}')
-                    # Attempt to start monitoring for unmonitored online streams
-                    auto_start_monitoring_on_online(stream)
-                    
-                    # Emit update for each stream
-                    emit_stream_update({
-                        'id': stream.id,
-                        'url': stream.room_url,
-                        'status': stream.status,
-                        'type': stream.type,
-                        'streamer_username': stream.streamer_username,
-                        'isDetecting': stream.is_monitored
-                    })
-                    logger.debug(f'Emitted stream update for stream {stream.id} - {stream.streamer_username}')
-                except Exception as e:
-                    logger.error(f'Error processing stream {stream.id}: {str(e)}')
-                    continue
+        transitions = auto_start_streams(streams, emit=False)
+            
+        # Emit updates only after the transaction is closed
+        for stream_id, room_url, stream_type, streamer_username, status, is_monitored in snapshots:
+            status = transitions.get(stream_id, status)
+            queue_stream_update({
+                'id': stream_id,
+                'url': room_url,
+                'status': status,
+                'type': stream_type,
+                'streamer_username': streamer_username,
+                'isDetecting': status == 'monitoring' or is_monitored
+            })
             
-            return [s.id for s in streams]
+        return [snapshot[0] for snapshot in snapshots]
             
     except Exception as e:
-        logger.error(f'Error fetching new streams from database: {str(e)}')
+        logger.error('Error fetching new streams from database: %s', e)
         return []
 
+def auto_start_streams(streams, emit=True):
+    """Auto-start a batch of streams and persist their status transitions together.
+
+    Returns the {stream_id: new_status} transitions. With emit=True a stream
+    update is broadcast for each stream that started monitoring, after the
+    commit.
+    """
+    transitions = {}
+    with db.session.no_autoflush:
+        for stream in streams:
+            try:
+                logger.debug('Processing stream %s - %s: type=%s, status=%s', stream.id, stream.streamer_username, stream.type, stream.status)
+                result = auto_start_monitoring_on_online(stream, commit=False)
+                if result:
+                    transitions[result[0]] = result[1]
+            except Exception as e:
+                logger.error('Error processing stream %s: %s', stream.id, e)
+                continue
+    
+    # Read the payload fields before the commit expires the instances
+    started = [
+        (stream.id, stream.room_url, stream.type)
+        for stream in streams
+        if transitions.get(stream.id) == 'monitoring'
+    ] if emit else []
+    
+    apply_stream_transitions(transitions)
+    
+    for stream_id, room_url, stream_type in started:
+        queue_stream_update({
+            'id': stream_id,
+            'url': room_url,
+            'status': 'monitoring',
+            'type': stream_type,
+            'isDetecting': True
+        })
+    return transitions
+
+def apply_stream_transitions(transitions):
+    """Persist {stream_id: new_status} transitions with one UPDATE per status and a single commit."""
+    if not transitions:
+        return
+    by_status = {}
+    for stream_id, status in transitions.items():
+        by_status.setdefault(status, []).append(stream_id)
+    try:
+        for status, ids in by_status.items():
+            values = {'status': status}
+            if status == 'monitoring':
+                values['is_monitored'] = True
+            db.session.execute(
+                update(Stream).where(Stream.id.in_(ids)).values(**values),
+                execution_options={'synchronize_session': False}
+            )
+        db.session.commit()
+    except Exception as e:
+        logger.error('Error persisting status for %s streams: %s', len(transitions), e)
+        db.session.rollback()
+        return
+    # Bulk UPDATEs bypass ORM events, so evict cached statuses here
+    for stream_id in transitions:
+        _stream_status_cache.pop(stream_id, None)
+    invalidate_online_streams()
+
 def refresh_and_monitor_streams(stream_ids):
     """Refresh and start monitoring streams."""
     try:
-        with current_app.app_context():
-            streams = Stream.query.filter(Stream.id.in_(stream_ids)).all()
-            if not streams:
-                logger.warning('No streams found for provided IDs.')
-                return False
+        # One bulk SELECT; populate_existing overwrites any stale instances in the session
+        streams = Stream.query.filter(Stream.id.in_(stream_ids)).populate_existing().all()
+        if not streams:
+            logger.warning('No streams found for provided IDs.')
+            return False
                 
-            for stream in streams:
-                try:
-                    logger.debug(f'Refreshing stream {stream.id} - {stream.streamer_username}')
-                    db.session.refresh(stream)
-                    
-                    if stream.status != 'online':
-                        logger.info(f'Skipping stream {stream.id} - {stream.streamer_username}: not online (status={stream.status})')
-                        continue
-                        
-                    if stream.is_monitored:
-                        logger.info(f'Stream {stream.id} - {stream.streamer_username} is already monitored.')
-                        continue
-                        
-                    # Attempt to start monitoring
-                    auto_start_monitoring_on_online(stream)
+        pending = []
+        for stream in streams:
+            if stream.status != 'online':
+                logger.info('Skipping stream %s - %s: not online (status=%s)', stream.id, stream.streamer_username, stream.status)
+                continue
                     
-                except Exception as e:
-                    logger.error(f'Error processing stream {stream.id}: {str(e)}')
-                    continue
+            if stream.is_monitored:
+                logger.info('Stream %s - %s is already monitored.', stream.id, stream.streamer_username)
+                continue
                     
-            return True
+            pending.append(stream)
+            
+        auto_start_streams(pending)
+        return True
             
     except Exception as e:
-        logger.error(f'Error refreshing and monitoring streams: {str(e)}')
+        logger.error('Error refreshing and monitoring streams: %s', e)
         return False
 
 def start_notification_monitor(clean_start=False):
@@ -853,102 +1518,111 @@ def start_notification_monitor(clean_start=False):
             # No automatic starting of stream monitoring
             logger.info('Notification monitor initialized without automatic stream monitoring.')
     except Exception as e:
-        logger.error(f'Error starting notification monitor: {str(e)}')
+        logger.error('Error starting notification monitor: %s', e)
         raise
 
+def _release_session():
+    """Drop the identity map and connection held by the session after a periodic pass."""
+    try:
+        db.session.expunge_all()
+        db.session.close()
+    except Exception as e:
+        logger.error('Error releasing database session: %s', e)
+
 def monitor_new_streams(app):
-    """Background task to monitor for new streams."""
-    check_interval = int(os.getenv('CHECK_INTERVAL', 900))
-    
-    while True:
+    """Check once for new or unmonitored online streams and start monitoring them."""
+    if os.getenv('CONTINUOUS', 'true').lower() != 'true':
+        logger.debug('Continuous monitoring disabled; skipping new stream check.')
+        return
+    logger.debug('Checking for new or online streams.')
+    with app.app_context():
         try:
-            gevent.sleep(check_interval)
-            logger.debug('Checking for new or online streams.')
-            
-            with app.app_context():
-                stream_ids = fetch_new_streams_from_platforms()
-                logger.info(f'Found {len(stream_ids)} new or unmonitored streams.')
-                if stream_ids:
-                    refresh_and_monitor_streams(stream_ids)
-                    logger.info(f'Attempted to refresh and monitor {len(stream_ids)} streams.')
-                else:
-                    logger.debug('No new or unmonitored streams found.')
-                    
-        except Exception as e:
-            logger.error(f'Error in monitor_new_streams: {str(e)}')
-            gevent.sleep(check_interval)
+            stream_ids = fetch_new_streams_from_platforms()
+            logger.info('Found %s new or unmonitored streams.', len(stream_ids))
+            if stream_ids:
+                refresh_and_monitor_streams(stream_ids)
+                logger.info('Attempted to refresh and monitor %s streams.', len(stream_ids))
+            else:
+                logger.debug('No new or unmonitored streams found.')
+        finally:
+            _release_session()
 
 def retry_failed_streams(app):
-    """Background task to retry failed streams."""
-    retry_interval = int(os.getenv('RETRY_INTERVAL', 3600))
-    
-    while True:
+    """Retry monitoring once for online streams that are not monitored."""
+    with app.app_context():
         try:
-            gevent.sleep(retry_interval)
+            failed_streams = [stream for stream in get_online_streams() if not stream.is_monitored]
             
-            with current_app.app_context():
-                failed_streams = Stream.query.filter(
-                    Stream.is_monitored == False,
-                    Stream.status == 'online'
-                ).all()
-                
-                if failed_streams:
-                    stream_ids = [stream.id for stream in failed_streams]
-                    logger.info(f'Found {len(failed_streams)} unmonitored online streams to retry.')
-                    refresh_and_monitor_streams(stream_ids)
-                    logger.info(f'Attempted to retry {len(failed_streams)} failed online streams.')
-                else:
-                    logger.debug('No unmonitored online streams to retry.')
-                    
-        except Exception as e:
-            logger.error(f'Error in retry_failed_streams: {str(e)}')
-            gevent.sleep(retry_interval)
+            if failed_streams:
+                stream_ids = [stream.id for stream in failed_streams]
+                logger.info('Found %s unmonitored online streams to retry.', len(failed_streams))
+                refresh_and_monitor_streams(stream_ids)
+                logger.info('Attempted to retry %s failed online streams.', len(failed_streams))
+            else:
+                logger.debug('No unmonitored online streams to retry.')
+        finally:
+            _release_session()
 
 def get_monitoring_status():
     """Get current monitoring status for all streams."""
     try:
         with current_app.app_context():
-            streams = Stream.query.all()
+            total, monitored, online = db.session.query(
+                func.count(Stream.id),
+                func.coalesce(func.sum(case((Stream.is_monitored == True, 1), else_=0)), 0),
+                func.coalesce(func.sum(case((Stream.status == 'online', 1), else_=0)), 0)
+            ).one()
             status = {
-                'total_streams': len(streams),
-                'monitored_streams': sum(1 for s in streams if s.is_monitored),
-                'online_streams': sum(1 for s in streams if s.status == 'online'),
+                'total_streams': total,
+                'monitored_streams': int(monitored),
+                'online_streams': int(online),
                 'active_processors': len(stream_processors),
                 'enable_monitoring': True,
                 'continuous_monitoring': os.getenv('CONTINUOUS', 'true').lower() == 'true',
                 'streams': []
             }
             
-            for stream in streams:
-                stream_url = get_m3u8_url(stream) or stream.room_url
+            rows = db.session.query(
+                Stream.id, Stream.streamer_username, Stream.type, Stream.status, Stream.is_monitored
+            ).all()
+            for stream_id, streamer, platform, stream_status, is_monitored in rows:
                 stream_info = {
-                    'id': stream.id,
-                    'streamer': stream.streamer_username,
-                    'platform': stream.type,
-                    'status': stream.status,
-                    'is_monitored': stream.is_monitored,
-                    'has_processor': stream_url in stream_processors
+                    'id': stream_id,
+                    'streamer': streamer,
+                    'platform': platform,
+                    'status': stream_status,
+                    'is_monitored': is_monitored,
+                    'has_processor': stream_id in stream_processors
                 }
                 status['streams'].append(stream_info)
                 
             return status
     except Exception as e:
-        logger.error(f'Error getting monitoring status: {str(e)}')
+        logger.error('Error getting monitoring status: %s', e)
         return None
 
+def _stop_monitoring_in_context(app, stream_id):
+    """Stop one stream from a pool greenlet, which has no app context of its own."""
+    with app.app_context():
+        try:
+            stop_monitoring_by_id(stream_id)
+        except Exception as e:
+            logger.error('Error stopping monitoring for %s: %s', stream_id, e)
+
 def restart_all_streams():
     """Restart all monitoring for online streams."""
     logger.info('Restarting all monitoring for online streams.')
     
     try:
         with current_app.app_context():
-            streams = Stream.query.filter(Stream.is_monitored == True).all()
-            for stream in streams:
-                try:
-                    stop_monitoring(stream)
-                except Exception as e:
-                    logger.error(f'Error stopping monitoring for {stream.id}: {str(e)}')
-                    continue
+            stream_ids = [row.id for row in
+                          db.session.query(Stream.id).filter(Stream.is_monitored == True).all()]
+            # Streams are stopped side by side so one hung task cannot stall the restart
+            app = current_app._get_current_object()
+            pool = Pool(RESTART_STOP_CONCURRENCY)
+            for stream_id in stream_ids:
+                pool.spawn(_stop_monitoring_in_context, app, stream_id)
+            pool.join()
             
             gevent.sleep(2)
             
@@ -957,125 +1631,146 @@ def restart_all_streams():
                 logger.info('Monitoring restarted.')
                 return True
             except Exception as e:
-                logger.error(f'Error restarting monitoring: {str(e)}')
+                logger.error('Error restarting monitoring: %s', e)
                 return False
                 
     except Exception as e:
-        logger.error(f'Error restarting all monitoring: {str(e)}')
+        logger.error('Error restarting all monitoring: %s', e)
         return False
 
-def schedule_periodic_detection(app, interval=3600):
-    """Schedule periodic detection for online streams."""
-    logger.info(f'Scheduling periodic detection with interval {interval} seconds.')
-    while True:
+def run_periodic_detection(app):
+    """Run one periodic detection pass over online streams."""
+    with app.app_context():
         try:
-            with app.app_context():
-                streams = Stream.query.filter(
-                    Stream.status == 'online'
-                ).all()
-                logger.info(f'Found {len(streams)} online streams for periodic detection.')
-                for stream in streams:
-                    try:
-                        db.session.refresh(stream)
-                        logger.debug(f'Checking stream {stream.id} - {stream.streamer_username}: status={stream.status}, is_monitored={stream.is_monitored}')
-                        auto_start_monitoring_on_online(stream)
-                    except Exception as e:
-                        logger.error(f'Error processing stream {stream.id}: {str(e)}')
-                        continue
+            streams = get_online_streams()
+            logger.info('Found %s online streams for periodic detection.', len(streams))
+            auto_start_streams(streams)
+        finally:
+            _release_session()
+
+def _fetch_room_chat(app, room_url, streamer_username):
+    """Fetch one room's chat, retrying with exponential backoff and jitter.
+
+    Returns the fetched messages, or None if every attempt failed.
+    """
+    max_retries = 3
+    with app.app_context():
+        for attempt in range(1, max_retries + 1):
+            try:
+                return fetch_chat_messages(room_url)
+            except Exception as e:
+                logger.warning('Chat detection error for %s: retry %s/%s: %s', streamer_username, attempt, max_retries, e)
+                if attempt >= max_retries:
+                    logger.error('Max retries exceeded for %s', streamer_username)
+                    return None
+                gevent.sleep(min(CHAT_RETRY_MAX_BACKOFF, 2 ** attempt) + random.uniform(0, 1))
+
+def fetch_chat_messages_concurrently(app, rooms):
+    """Fetch chat for many (room_url, streamer_username) pairs at once.
+
+    Fetches run on a bounded pool and (room_url, messages or None) pairs are
+    yielded in completion order, so one slow room never delays the rest.
+    """
+    pool = Pool(PERIODIC_CHAT_CONCURRENCY)
+    fetch = lambda room: (room[0], _fetch_room_chat(app, *room))
+    return pool.imap_unordered(fetch, rooms)
+
+def _analyse_room_chat(room_url, streamer_username, platform, messages):
+    """Run detection over one room's fetched chat and emit any alerts."""
+    chat_detections = process_chat_messages(sanitize_chat_messages(messages), room_url)
+    if not chat_detections:
+        return
+    logger.info('Detected %s chat issues for %s', len(chat_detections), streamer_username)
+    log_chat_detection(chat_detections, room_url)
+    emit_notification_batch([
+        _chat_alert_payload(detection, room_url, streamer_username, platform)
+        for detection in chat_detections
+    ])
+
+def _prune_chat_last_success(now, success_cooldown):
+    """Forget cooldowns that have long expired once the table grows large."""
+    if len(_chat_last_success) <= CHAT_LAST_SUCCESS_MAX:
+        return
+    cutoff = now - 2 * success_cooldown
+    for room_url in [url for url, ts in _chat_last_success.items() if ts < cutoff]:
+        del _chat_last_success[room_url]
+
+def run_periodic_chat_detection(app, success_cooldown=1800):
+    """Run one periodic chat detection pass over online streams."""
+    with app.app_context():
+        try:
+            streams = get_online_streams()
+            logger.info('Found %s online streams for periodic chat.', len(streams))
+            
+            current_time = time.time()
+            _prune_chat_last_success(current_time, success_cooldown)
+            due = {}
+            for stream in streams:
+                if current_time - _chat_last_success.get(stream.room_url, 0) < success_cooldown:
+                    logger.debug('Skipping chat for %s: In cooldown.', stream.streamer_username)
+                    continue
+                due[stream.room_url] = (stream.streamer_username, stream.type.lower())
+            
+            # Each room is analysed as soon as its fetch completes
+            fetched = fetch_chat_messages_concurrently(app, [(room_url, info[0]) for room_url, info in due.items()])
+            for room_url, messages in fetched:
+                streamer_username, platform = due[room_url]
+                if messages is None:
+                    continue
+                if not messages:
+                    logger.debug('No chat messages for %s', streamer_username)
+                    continue
                 try:
-                    db.session.commit()
+                    _analyse_room_chat(room_url, streamer_username, platform, messages)
+                    _chat_last_success[room_url] = current_time
                 except Exception as e:
-                    logger.error(f'Error committing session: {str(e)}')
-                    db.session.rollback()
-        except Exception as e:
-            logger.error(f'Error in periodic detection: {str(e)}')
-        gevent.sleep(interval)
+                    logger.error('Error analysing chat for %s: %s', streamer_username, e)
+        finally:
+            _release_session()
+
+def schedule_periodic_detection(app, interval=3600):
+    """Schedule periodic detection for online streams."""
+    logger.info('Scheduling periodic detection with interval %s seconds.', interval)
+    register_periodic_task('periodic_detection', run_periodic_detection, interval, app)
 
 def schedule_periodic_chat_detection(app, check_interval=900, success_cooldown=1800, max_seconds=600):
     """Schedule periodic chat detection for online streams."""
-    logger.info(f'Scheduling periodic chat detection with interval {check_interval} seconds.')
-    stream_last_success = {}
-    
-    while True:
-        try:
-            with app.app_context():
-                streams = Stream.query.filter(
-                    Stream.status == 'online'
-                ).all()
-                logger.info(f'Found {len(streams)} online streams for periodic chat.')
-                
-                for stream in streams:
-                    room_url = stream.room_url
-                    streamer_username = stream.streamer_username
-                    current_time = time.time()
-                    last_success = stream_last_success.get(room_url, 0)
-                    
-                    if current_time - last_success < success_cooldown:
-                        logger.debug(f'Skipping chat for {streamer_username}: In cooldown.')
-                        continue
-                        
-                    retry_count = 0
-                    max_retries = 3
-                    while retry_count < max_retries:
-                        try:
-                            messages = fetch_chat_messages(room_url)
-                            if messages:
-                                chat_detections = process_chat_messages(messages, room_url)
-                                if chat_detections:
-                                    logger.info(f'Detected {len(chat_detections)} chat issues for {streamer_username}')
-                                    log_chat_detection(chat_detections, room_url)
-                                    for detection in chat_detections:
-                                        notification_data = {
-                                            'event_type': 'chat_alert',
-                                            'timestamp': datetime.now().isoformat(),
-                                            'details': {
-                                                'type': detection.get('type'),
-                                                'message': detection.get('message'),
-                                                'username': detection.get('username'),
-                                                'streamer_name': streamer_username,
-                                                'platform': stream.type.lower(),
-                                                'room_url': stream.room_url,
-                                                'stream_url': stream.room_url
-                                            },
-                                            'read': False,
-                                            'room_url': room_url,
-                                            'streamer': streamer_username,
-                                            'platform': stream.type.lower(),
-                                            'assigned_agent': 'Unassigned'
-                                        }
-                                        emit_notification(notification_data)
-                                stream_last_success[room_url] = current_time
-                                break
-                            logger.debug(f'No chat messages for {streamer_username}')
-                            break
-                        except Exception as e:
-                            retry_count += 1
-                            logger.warning(f'Chat detection error for {streamer_username}: retry {retry_count}/{max_retries}: {str(e)}')
-                            if retry_count >= max_retries:
-                                logger.error(f'Max retries exceeded for {streamer_username}')
-                                break
-                            gevent.sleep(10)
-        except Exception as e:
-            logger.error(f'Error in periodic chat detection: {str(e)}')
-        gevent.sleep(check_interval)
+    logger.info('Scheduling periodic chat detection with interval %s seconds.', check_interval)
+    register_periodic_task('periodic_chat_detection', run_periodic_chat_detection, check_interval, app, success_cooldown)
 
-def auto_start_monitoring_on_online(stream):
-    """Automatically start monitoring when a stream's status changes to online."""
+def start_periodic_tasks(app):
+    """Register all background polling tasks on the shared scheduler."""
+    check_interval = int(os.getenv('CHECK_INTERVAL', 900))
+    retry_interval = int(os.getenv('RETRY_INTERVAL', 3600))
+    register_periodic_task('monitor_new_streams', monitor_new_streams, check_interval, app, delay=check_interval)
+    register_periodic_task('retry_failed_streams', retry_failed_streams, retry_interval, app, delay=retry_interval)
+    schedule_periodic_detection(app)
+    schedule_periodic_chat_detection(app)
+
+def auto_start_monitoring_on_online(stream, commit=True):
+    """Automatically start monitoring when a stream's status changes to online.
+
+    Returns a (stream_id, new_status) tuple for streams whose status changed,
+    otherwise None. With commit=False the new status is not written; the
+    caller is expected to persist the returned transitions itself.
+    """
     try:
+        stream_id = stream.id
         stream_url = get_m3u8_url(stream) or stream.room_url
-        logger.debug(f'Checking auto-start for stream {stream.id} - {stream.streamer_username}: status={stream.status}, is_monitored={stream.is_monitored}, stream_url={stream_url}, room_url={stream.room_url}')
+        logger.debug('Checking auto-start for stream %s - %s: status=%s, is_monitored=%s, stream_url=%s, room_url=%s',
+                     stream.id, stream.streamer_username, stream.status, stream.is_monitored, stream_url, stream.room_url)
         
         if stream.status != 'online':
-            logger.info(f'Stream {stream.id} - {stream.streamer_username} is not online (status={stream.status}), skipping.')
-            return
+            logger.info('Stream %s - %s is not online (status=%s), skipping.', stream.id, stream.streamer_username, stream.status)
+            return None
             
         if stream.is_monitored:
-            logger.debug(f'Stream {stream.id} - {stream.streamer_username} is already monitored.')
-            return
+            logger.debug('Stream %s - %s is already monitored.', stream.id, stream.streamer_username)
+            return None
             
         if not stream_url or not stream.room_url:
-            logger.error(f'No valid URLs for stream {stream.id} - {stream.streamer_username}: stream_url={stream_url}, room_url={stream.room_url}')
-            NotificationService.notify_admins(
+            logger.error('No valid URLs for stream %s - %s: stream_url=%s, room_url=%s', stream.id, stream.streamer_username, stream_url, stream.room_url)
+            queue_admin_alert(
                 event_type='system_alert',
                 details={
                     'message': f'No valid URL for stream {stream.streamer_username}',
@@ -1088,35 +1783,36 @@ def auto_start_monitoring_on_online(stream):
                 streamer=stream.streamer_username,
                 priority='high'
             )
-            return
+            return None
             
-        if not check_stream_availability(stream_url):
-            logger.warning(f'Stream {stream.id} - {stream.streamer_username} is not accessible at {stream_url}')
-            with current_app.app_context():
+        if not check_stream_availability(stream_url, max_age=AUTO_START_PROBE_TTL):
+            logger.warning('Stream %s - %s is not accessible at %s', stream.id, stream.streamer_username, stream_url)
+            if commit:
                 stream.status = 'offline'
                 db.session.commit()
-            return
+            return stream_id, 'offline'
             
-        logger.info(f'Auto-starting monitoring for {stream.id} - {stream.streamer_username}')
-        success = start_monitoring(stream)
+        logger.info('Auto-starting monitoring for %s - %s', stream.id, stream.streamer_username)
+        success = start_monitoring(stream, persist=commit)
         if success:
-            logger.info(f'Successfully started monitoring for {stream.id} - {stream.streamer_username}')
-            with current_app.app_context():
+            logger.info('Successfully started monitoring for %s - %s', stream.id, stream.streamer_username)
+            if commit:
                 stream = Stream.query.get(stream.id)
                 if stream:
                     stream.is_monitored = True
                     stream.status = 'monitoring'
                     db.session.commit()
-                    emit_stream_update({
+                    queue_stream_update({
                         'id': stream.id,
                         'url': stream.room_url,
                         'status': 'monitoring',
                         'type': stream.type,
                         'isDetecting': True
                     })
+            return stream_id, 'monitoring'
         else:
-            logger.error(f'Failed to auto-start monitoring for {stream.id} - {stream.streamer_username}')
-            NotificationService.notify_admins(
+            logger.error('Failed to auto-start monitoring for %s - %s', stream.id, stream.streamer_username)
+            queue_admin_alert(
                 event_type='system_alert',
                 details={
                     'message': f'Failed to auto-start monitoring for {stream.streamer_username}',
@@ -1129,9 +1825,10 @@ def auto_start_monitoring_on_online(stream):
                 streamer=stream.streamer_username,
                 priority='high'
             )
+            return None
     except Exception as e:
-        logger.error(f'Error in auto_start_monitoring for {stream.id}: {str(e)}')
-        NotificationService.notify_admins(
+        logger.error('Error in auto_start_monitoring for %s: %s', stream.id, e)
+        queue_admin_alert(
             event_type='system_alert',
             details={
                 'message': f'Error auto-starting monitoring for {stream.streamer_username}: {str(e)}',
@@ -1144,11 +1841,13 @@ def auto_start_monitoring_on_online(stream):
             streamer=stream.streamer_username,
             priority='high'
         )
+        return None
 
 # Exports
 __all__ = [
     'start_monitoring',
     'stop_monitoring',
+    'stop_monitoring_by_id',
     'process_audio_segment',
     'process_video_frame',
     'process_chat_messages',
@@ -1,18 +1,31 @@
 # audio_processing.py
 import logging
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
-import librosa
+import time
+import threading
 import hashlib
+from functools import lru_cache
+from math import gcd
+from scipy.signal import resample_poly
 from flask import current_app
+import gevent
 from gevent.lock import Semaphore
-from models import DetectionLog, Stream, ChaturbateStream, StripchatStream, ChatKeyword
+from gevent.queue import Queue, Full, Empty
+from models import DetectionLog, ChatKeyword
 from extensions import db
+from sqlalchemy import event
 from utils.notifications import emit_notification
+from utils.keyword_matching import get_keyword_matcher, match_flagged_keywords
+from utils.stream_lookup import cache_get, cache_put, cached_stream_lookup, clear_stream_lookups, lookup_stream
 from dotenv import load_dotenv
-from collections import defaultdict
-import timeout_decorator
+from collections import OrderedDict, defaultdict
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
 
 # Load environment variables from .env file
 load_dotenv()
@@ -27,49 +40,66 @@ logger = logging.getLogger(__name__)
 
 # External dependencies
 _whisper_model = None
+_whisper_load_lock = Semaphore()
+
+# Lookups repeated for every audio segment, cached as key -> (fetched_at, value)
+KEYWORD_CACHE_TTL = float(os.getenv('KEYWORD_CACHE_TTL', 30))
+_keyword_cache = {}
+
+# Per-worker float32 scratch space for level measurement and normalization
+_scratch = threading.local()
 
-# Smart alert filtering system
-_alert_cache = defaultdict(dict)
+# Detection logs are written in batches by one background greenlet
+LOG_QUEUE_SIZE = 10000
+LOG_BATCH_SIZE = 100
+_log_queue = Queue(maxsize=LOG_QUEUE_SIZE)
+_log_flusher = None
+
+# Smart alert filtering system: per stream, cached alerts in insertion (oldest-first) order
+# plus a keyword -> alert hash index
+_alert_cache = defaultdict(lambda: {'entries': OrderedDict(), 'by_keyword': defaultdict(set)})
 
 # Configuration for smart filtering
 DUPLICATE_WINDOW_MINUTES = int(os.getenv('DUPLICATE_ALERT_WINDOW_MINUTES', 5))
 SIMILARITY_THRESHOLD = float(os.getenv('TRANSCRIPT_SIMILARITY_THRESHOLD', 0.8))
 MAX_CACHE_SIZE = int(os.getenv('MAX_ALERT_CACHE_SIZE', 10000))
 TRANSCRIPTION_TIMEOUT = int(os.getenv('TRANSCRIPTION_TIMEOUT', 900))
+SILENCE_PEAK_THRESHOLD = float(os.getenv('SILENCE_PEAK_THRESHOLD', 1e-3))
+SILENCE_RMS_THRESHOLD = float(os.getenv('SILENCE_RMS_THRESHOLD', 0.003))  # About -50 dBFS, before normalization
+WHISPER_COMPUTE_TYPE = os.getenv('WHISPER_COMPUTE_TYPE', 'int8')
+WHISPER_LANGUAGE = os.getenv('WHISPER_LANGUAGE') or None  # None lets Whisper detect the language
+WHISPER_NUM_WORKERS = int(os.getenv('WHISPER_NUM_WORKERS', 2))
+ENABLE_AUDIO_MONITORING = os.getenv('ENABLE_AUDIO_MONITORING', 'true').lower() == 'true'
+_transcribe_slots = Semaphore(WHISPER_NUM_WORKERS)  # Bounds in-flight transcriptions to the model's workers
 
 def initialize_audio_globals(whisper_model=None):
     """Initialize global variables for model"""
     global _whisper_model
     _whisper_model = whisper_model
+    if _whisper_model is None:
+        load_whisper_model()
     logger.info("Audio globals initialized")
 
 def load_whisper_model(app=None):
-    """Load the OpenAI Whisper model with configurable size and fallback"""
-    if app is None:
-        app = current_app._get_current_object()
-
-    with app.app_context():
-        enable_audio_monitoring = os.getenv('ENABLE_AUDIO_MONITORING', 'true').lower() == 'true'
-        if not enable_audio_monitoring:
+    """Load the faster-whisper (CTranslate2) model with configurable size and fallback"""
+    global _whisper_model
+    with _whisper_load_lock:
+        if not ENABLE_AUDIO_MONITORING:
             logger.info("Audio monitoring disabled; skipping Whisper model loading")
             return None
-        global _whisper_model
         if _whisper_model is None:
             try:
-                import whisper
+                from faster_whisper import WhisperModel
                 model_size = os.getenv('WHISPER_MODEL_SIZE', 'tiny')
-                logger.info(f"Loading Whisper model: {model_size}")
-                _whisper_model = whisper.load_model(model_size)  # Force CPU to avoid GPU contention
+                cpu_threads = max(1, (os.cpu_count() or 2) // 2)
+                logger.info(f"Loading Whisper model: {model_size} ({WHISPER_COMPUTE_TYPE}, {cpu_threads} threads)")
+                # Force CPU to avoid GPU contention; int8 weights use the quantized CTranslate2 kernels
+                _whisper_model = WhisperModel(model_size, device="cpu", compute_type=WHISPER_COMPUTE_TYPE,
+                                              cpu_threads=cpu_threads, num_workers=WHISPER_NUM_WORKERS)
                 logger.info(f"Whisper model '{model_size}' loaded successfully")
-            except AttributeError as e:
-                logger.error(f"Whisper attribute error: {e}. Ensure 'openai-whisper' is installed correctly.")
-                try:
-                    logger.info("Attempting to load fallback 'tiny' model")
-                    _whisper_model = whisper.load_model("tiny", device="cpu")
-                    logger.info("Fallback Whisper model loaded")
-                except Exception as e2:
-                    logger.error(f"Error loading fallback model: {e2}")
-                    _whisper_model = None
+            except ImportError as e:
+                logger.error(f"Whisper import error: {e}. Ensure 'faster-whisper' is installed correctly.")
+                _whisper_model = None
             except Exception as e:
                 logger.error(f"Error loading Whisper model: {e}")
                 _whisper_model = None
@@ -79,112 +109,129 @@ def load_whisper_model(app=None):
 
 def refresh_flagged_keywords(app=None):
     """Retrieve current flagged keywords from database"""
+    cached = cache_get(_keyword_cache, 'keywords', KEYWORD_CACHE_TTL)
+    if cached is not None:
+        return cached
+
     if app is None:
         app = current_app._get_current_object()
 
     with app.app_context():
         try:
             keywords = [kw.keyword.lower() for kw in ChatKeyword.query.all()]
-            logger.debug(f"Retrieved {len(keywords)} flagged keywords: {keywords}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Retrieved {len(keywords)} flagged keywords: {keywords}")
+            get_keyword_matcher(keywords)
+            cache_put(_keyword_cache, 'keywords', keywords)
             return keywords
         except Exception as e:
             logger.error(f"Error retrieving flagged keywords: {e}")
             return []
 
-def get_stream_info(stream_url, app=None):
-    """Identify platform and streamer from URL"""
+def clear_stream_caches():
+    """Drop cached keywords and stream lookups so the next call hits the database"""
+    _keyword_cache.clear()
+    clear_stream_lookups()
+
+def _clear_keyword_cache(mapper, connection, target):
+    _keyword_cache.clear()
+
+for _event_name in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(ChatKeyword, _event_name, _clear_keyword_cache)
+
+def _lookup_stream(stream_url, app=None):
+    """Return the StreamLookup for a URL, pushing an app context only on a cache miss"""
+    lookup = cached_stream_lookup(stream_url)
+    if lookup is not None:
+        return lookup
     if app is None:
         app = current_app._get_current_object()
-
     with app.app_context():
-        try:
-            cb_stream = ChaturbateStream.query.filter_by(chaturbate_m3u8_url=stream_url).first()
-            if cb_stream:
-                return 'chaturbate', cb_stream.streamer_username
-            sc_stream = StripchatStream.query.filter_by(stripchat_m3u8_url=stream_url).first()
-            if sc_stream:
-                return 'stripchat', sc_stream.streamer_username
-            stream = Stream.query.filter_by(room_url=stream_url).first()
-            if stream:
-                return stream.type.lower(), stream.streamer_username
-            logger.warning(f"No stream found for URL: {stream_url}")
-            return 'unknown', 'unknown'
-        except Exception as e:
-            logger.error(f"Error getting stream info for {stream_url}: {e}")
-            return 'unknown', 'unknown'
+        lookup = lookup_stream(stream_url)
+    if lookup is None:
+        logger.warning(f"No stream found for URL: {stream_url}")
+    elif lookup.assignment_id is None:
+        logger.info(f"No assignments found for stream: {stream_url}")
+    return lookup
+
+def get_stream_info(stream_url, app=None):
+    """Identify platform and streamer from URL"""
+    try:
+        lookup = _lookup_stream(stream_url, app)
+        if lookup:
+            return lookup.platform, lookup.streamer
+        return 'unknown', 'unknown'
+    except Exception as e:
+        logger.error(f"Error getting stream info for {stream_url}: {e}")
+        return 'unknown', 'unknown'
 
 def get_stream_assignment(stream_url, app=None):
     """Get assignment info for a stream"""
-    if app is None:
-        app = current_app._get_current_object()
+    try:
+        lookup = _lookup_stream(stream_url, app)
+        if lookup:
+            return lookup.assignment_id, lookup.agent_id
+        return None, None
+    except Exception as e:
+        logger.error(f"Error getting stream assignment for {stream_url}: {e}")
+        return None, None
 
-    from sqlalchemy.orm import joinedload
-    with app.app_context():
-        try:
-            stream = Stream.query.filter_by(room_url=stream_url).first()
-            if not stream:
-                cb_stream = ChaturbateStream.query.filter_by(chaturbate_m3u8_url=stream_url).first()
-                if cb_stream:
-                    stream = Stream.query.get(cb_stream.id)
-                else:
-                    sc_stream = StripchatStream.query.filter_by(stripchat_m3u8_url=stream_url).first()
-                    if sc_stream:
-                        stream = Stream.query.get(sc_stream.id)
-            
-            if not stream:
-                logger.warning(f"No stream found for URL: {stream_url}")
-                return None, None
-            
-            from models import Assignment
-            query = Assignment.query.options(
-                joinedload(Assignment.agent),
-                joinedload(Assignment.stream)
-            ).filter_by(stream_id=stream.id)
-            
-            assignments = query.all()
-            
-            if not assignments:
-                logger.info(f"No assignments found for stream: {stream_url}")
-                return None, None
-            
-            assignment = assignments[0]
-            agent_id = assignment.agent_id
-            return assignment.id, agent_id
-        except Exception as e:
-            logger.error(f"Error getting stream assignment for {stream_url}: {e}")
-            return None, None
+def _scratch_buffer(size):
+    """Return a float32 scratch view of at least size samples, reused across segments"""
+    buf = getattr(_scratch, 'buf', None)
+    if buf is None or buf.size < size:
+        buf = _scratch.buf = np.empty(size, dtype=np.float32)
+    return buf[:size]
 
 def normalize_audio(audio_data):
-    """Normalize audio volume to improve transcription reliability"""
-    try:
-        max_amplitude = np.max(np.abs(audio_data))
-        if max_amplitude > 0:
-            audio_data = audio_data / max_amplitude
-        return audio_data
-    except Exception as e:
-        logger.error(f"Error normalizing audio: {e}")
-        return audio_data
+    """Normalize audio volume in place to improve transcription reliability
 
-def calculate_text_similarity(text1, text2):
-    """Calculate similarity between two text strings using simple word overlap"""
-    if not text1 or not text2:
-        return 0.0
-    
-    words1 = set(text1.lower().split())
-    words2 = set(text2.lower().split())
-    
+    Expects a float32 array and returns the same array, scaled to a peak of 1.
+    """
+    peak = np.abs(audio_data, out=_scratch_buffer(audio_data.size)).max() if audio_data.size else 0
+    if peak > 0:
+        np.multiply(audio_data, np.float32(1.0 / peak), out=audio_data)
+    return audio_data
+
+@lru_cache(maxsize=16)
+def resample_ratio(orig_sr, target_sr):
+    """Reduce a sample-rate conversion to its polyphase (up, down) factors"""
+    divisor = gcd(int(orig_sr), int(target_sr))
+    return int(target_sr) // divisor, int(orig_sr) // divisor
+
+def resample_audio(audio_data, orig_sr, target_sr):
+    """Resample with a single polyphase FIR pass"""
+    up, down = resample_ratio(orig_sr, target_sr)
+    return resample_poly(audio_data, up, down, window=('kaiser', 5.0)).astype(np.float32, copy=False)
+
+def measure_audio_level(audio_data):
+    """Return (peak, rms) of a float32 buffer, with the DC offset removed from the RMS"""
+    if audio_data.size == 0:
+        return 0.0, 0.0
+    scratch = _scratch_buffer(audio_data.size)
+    centered = np.subtract(audio_data, audio_data.mean(dtype=np.float32), out=scratch)
+    rms = float(np.sqrt(np.dot(centered, centered) / centered.size))
+    peak = float(np.abs(audio_data, out=scratch).max())
+    return peak, rms
+
+def tokenize_transcript(text):
+    """Split an already-lowercased transcript into its set of words"""
+    return frozenset(text.split()) if text else frozenset()
+
+def calculate_text_similarity(words1, words2):
+    """Calculate Jaccard word overlap between two tokenized transcripts"""
     if not words1 or not words2:
         return 0.0
     
-    intersection = words1.intersection(words2)
-    union = words1.union(words2)
-    
-    return len(intersection) / len(union) if union else 0.0
+    intersection = len(words1 & words2)
+    return intersection / (len(words1) + len(words2) - intersection)
 
-def generate_alert_hash(keywords, transcript, stream_url):
-    """Generate a hash for alert deduplication based on keywords and partial transcript"""
-    content = f"{stream_url}:{sorted(keywords)}:{transcript[:50].lower().strip()}"
-    return hashlib.md5(content.encode()).hexdigest()
+def generate_alert_hash(keyword_key, transcript_prefix, stream_url):
+    """Generate a hash for alert deduplication from sorted keywords and a normalized transcript prefix"""
+    content = f"{stream_url}:{keyword_key}:{transcript_prefix}"
+    if xxhash is not None:
+        return xxhash.xxh3_64_hexdigest(content)
+    return hashlib.blake2b(content.encode(), digest_size=8).hexdigest()
 
 def cleanup_old_cache_entries(stream_url):
     """Remove old cache entries to prevent memory bloat"""
@@ -193,68 +240,107 @@ def cleanup_old_cache_entries(stream_url):
     if stream_url not in _alert_cache:
         return
     
-    current_time = datetime.now()
-    cutoff_time = current_time - timedelta(minutes=DUPLICATE_WINDOW_MINUTES)
+    cache = _alert_cache[stream_url]
+    entries = cache['entries']
+    cutoff_time = time.monotonic() - DUPLICATE_WINDOW_MINUTES * 60
     
-    keys_to_remove = []
-    for alert_hash, alert_data in _alert_cache[stream_url].items():
-        if alert_data['timestamp'] < cutoff_time:
-            keys_to_remove.append(alert_hash)
-    
-    for key in keys_to_remove:
-        del _alert_cache[stream_url][key]
-    
-    if len(_alert_cache[stream_url]) > MAX_CACHE_SIZE:
-        sorted_entries = sorted(
-            _alert_cache[stream_url].items(),
-            key=lambda x: x[1]['timestamp'],
-            reverse=True
-        )
-        _alert_cache[stream_url] = dict(sorted_entries[:MAX_CACHE_SIZE])
-
-def is_duplicate_alert(detection, stream_url):
-    """Check if this alert is a duplicate of a recent one"""
+    # Entries are appended as they arrive, so expired and excess alerts are at the front
+    by_keyword = cache['by_keyword']
+    while entries:
+        alert_hash, alert_data = next(iter(entries.items()))
+        if alert_data['timestamp'] >= cutoff_time and len(entries) <= MAX_CACHE_SIZE:
+            break
+        entries.popitem(last=False)
+        for keyword in alert_data['keywords']:
+            postings = by_keyword.get(keyword)
+            if postings is not None:
+                postings.discard(alert_hash)
+                if not postings:
+                    del by_keyword[keyword]
+
+def is_duplicate_alert(keywords, transcript, stream_url, transcript_lc=None):
+    """Check if an alert for these keywords and transcript duplicates a recent one
+
+    transcript_lc is the lowercased transcript, when the caller already has it.
+    """
     global _alert_cache
     
     cleanup_old_cache_entries(stream_url)
     
-    keywords = detection.get("keyword", [])
-    transcript = detection.get("transcript", "")
-    current_time = datetime.now()
+    if transcript_lc is None:
+        transcript_lc = transcript.lower()
+    current_time = time.monotonic()
+    current_keywords = set(keywords)
+    current_tokens = tokenize_transcript(transcript_lc)
     
-    alert_hash = generate_alert_hash(keywords, transcript, stream_url)
+    alert_hash = generate_alert_hash(",".join(sorted(current_keywords)), transcript_lc[:50].strip(), stream_url)
+    cache = _alert_cache[stream_url]
+    entries = cache['entries']
+    by_keyword = cache['by_keyword']
     
-    if alert_hash in _alert_cache[stream_url]:
+    if alert_hash in entries:
         logger.info(f"Duplicate alert detected (exact match) for {stream_url}: {keywords}")
         return True
     
-    for cached_hash, cached_data in _alert_cache[stream_url].items():
-        cached_keywords = set(cached_data['keywords'])
-        current_keywords = set(keywords)
+    # Only alerts sharing at least one keyword are candidates
+    candidate_hashes = set()
+    for keyword in current_keywords:
+        candidate_hashes.update(by_keyword.get(keyword, ()))
+    
+    # Jaccard can only reach the threshold when the smaller set is at least
+    # SIMILARITY_THRESHOLD times the larger, so other sizes are skipped unscored
+    token_count = len(current_tokens)
+    min_count = token_count * SIMILARITY_THRESHOLD
+    max_count = token_count / SIMILARITY_THRESHOLD if SIMILARITY_THRESHOLD > 0 else float('inf')
+    for cached_hash in candidate_hashes:
+        cached_tokens = entries[cached_hash]['tokens']
+        if not min_count <= len(cached_tokens) <= max_count:
+            continue
+        similarity = calculate_text_similarity(current_tokens, cached_tokens)
         
-        keyword_overlap = len(cached_keywords.intersection(current_keywords))
-        if keyword_overlap > 0:
-            similarity = calculate_text_similarity(transcript, cached_data['transcript'])
-            
-            if similarity >= SIMILARITY_THRESHOLD:
-                logger.info(f"Similar alert detected for {stream_url}: {keywords} (similarity: {similarity:.2f})")
-                return True
+        if similarity >= SIMILARITY_THRESHOLD:
+            logger.info(f"Similar alert detected for {stream_url}: {keywords} (similarity: {similarity:.2f})")
+            return True
     
-    _alert_cache[stream_url][alert_hash] = {
+    entries[alert_hash] = {
         'timestamp': current_time,
-        'keywords': keywords,
-        'transcript': transcript
+        'keywords': current_keywords,
+        'transcript': transcript,
+        'tokens': current_tokens
     }
+    for keyword in current_keywords:
+        by_keyword[keyword].add(alert_hash)
     
     return False
 
-@timeout_decorator.timeout(TRANSCRIPTION_TIMEOUT, use_signals=False)
+def _run_transcription(model, audio_data):
+    segments, info = model.transcribe(audio_data, beam_size=1, vad_filter=True, language=WHISPER_LANGUAGE)
+    # Segments are decoded lazily, so joining them is what runs the model
+    return {"text": " ".join(segment.text.strip() for segment in segments), "language": info.language}
+
 def transcribe_audio(model, audio_data):
-    """Wrapper for Whisper transcription with timeout"""
+    """Wrapper for Whisper transcription with timeout
+
+    Decoding runs on the gevent hub's native threadpool. CTranslate2 releases the
+    GIL, so other greenlets keep running and segments from up to
+    WHISPER_NUM_WORKERS streams are decoded in parallel. Raises gevent.Timeout
+    after TRANSCRIPTION_TIMEOUT seconds; the slot stays taken until the timed-out
+    job actually finishes, so abandoned decodes can't pile up on the threadpool.
+    """
     try:
-        result = model.transcribe(audio_data, fp16=False, verbose=False)
-        logger.debug(f"Transcription result: {result}")
+        _transcribe_slots.acquire()
+        try:
+            job = gevent.get_hub().threadpool.spawn(_run_transcription, model, audio_data)
+        except Exception:
+            _transcribe_slots.release()
+            raise
+        job.rawlink(lambda _: _transcribe_slots.release())
+        result = job.get(timeout=TRANSCRIPTION_TIMEOUT)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Transcription result: {result}")
         return result
+    except gevent.Timeout:
+        raise
     except Exception as e:
         logger.error(f"Transcription error: {e}")
         raise
@@ -264,125 +350,181 @@ def process_audio_segment(audio_data, original_sample_rate, stream_url, app=None
     if app is None:
         app = current_app._get_current_object()
 
-    with app.app_context():  # Ensure context
-        enable_audio_monitoring = os.getenv('ENABLE_AUDIO_MONITORING', 'true').lower() == 'true'
-        if not enable_audio_monitoring:
-            logger.info(f"Audio monitoring disabled for {stream_url}")
-            return [], ""
-        model = load_whisper_model(app)
-        if model is None:
-            logger.warning(f"Skipping audio processing for {stream_url} due to unavailable Whisper model")
-            return [], ""
+    if not ENABLE_AUDIO_MONITORING:
+        logger.info(f"Audio monitoring disabled for {stream_url}")
+        return [], ""
+    model = _whisper_model if _whisper_model is not None else load_whisper_model(app)
+    if model is None:
+        logger.warning(f"Skipping audio processing for {stream_url} due to unavailable Whisper model")
+        return [], ""
     
-        audio_duration = len(audio_data) / original_sample_rate
-        audio_amplitude = np.max(np.abs(audio_data)) if len(audio_data) > 0 else 0
-        logger.info(f"Audio segment for {stream_url}: duration={audio_duration:.2f}s, sample_rate={original_sample_rate}, max_amplitude={audio_amplitude:.4f}")
-        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Processing audio segment for {stream_url}: duration={audio_duration:.2f}s, amplitude={audio_amplitude:.4f}")
+    audio_data = np.ascontiguousarray(audio_data, dtype=np.float32)
+    audio_duration = len(audio_data) / original_sample_rate
+    audio_amplitude, audio_rms = measure_audio_level(audio_data)
+    logger.info(f"Audio segment for {stream_url}: duration={audio_duration:.2f}s, sample_rate={original_sample_rate}, max_amplitude={audio_amplitude:.4f}, rms={audio_rms:.4f}")
         
-        if audio_amplitude < 1e-5:
-            logger.warning(f"Audio segment for {stream_url} has very low amplitude; may be silent")
-            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Skipping silent audio segment for {stream_url}")
-            return [], ""
+    # Silent segments are dropped before resampling and transcription
+    if audio_amplitude < SILENCE_PEAK_THRESHOLD or audio_rms < SILENCE_RMS_THRESHOLD:
+        logger.debug(f"Skipping silent audio segment for {stream_url}: max_amplitude={audio_amplitude:.4f} "
+                     f"(min {SILENCE_PEAK_THRESHOLD}), rms={audio_rms:.4f} (min {SILENCE_RMS_THRESHOLD})")
+        return [], ""
         
-        try:
-            target_sr = 16000
-            audio_data = normalize_audio(audio_data)
-            if original_sample_rate != target_sr:
-                logger.debug(f"Resampling audio for {stream_url} from {original_sample_rate} to {target_sr}")
-                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Resampling audio for {stream_url}")
-                audio_data = librosa.resample(audio_data, orig_sr=original_sample_rate, target_sr=target_sr)
-            logger.info(f"Transcribing audio for {stream_url}")
-            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Starting transcription for {stream_url}")
-            result = transcribe_audio(model, audio_data)
-            transcript = result.get("text", "").strip()
-            logger.debug(f"Raw transcription result for {stream_url}: {result}")
-            if transcript:
-                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Transcript for {stream_url}: {transcript}")
-                logger.info(f"Transcription for {stream_url}: {transcript[:100]}...")
+    try:
+        target_sr = 16000
+        audio_data = normalize_audio(audio_data)
+        if original_sample_rate != target_sr:
+            logger.debug(f"Resampling audio for {stream_url} from {original_sample_rate} to {target_sr}")
+            audio_data = resample_audio(audio_data, original_sample_rate, target_sr)
+        logger.info(f"Transcribing audio for {stream_url}")
+        result = transcribe_audio(model, audio_data)
+        transcript = result.get("text", "").strip()
+        transcript_lc = transcript.lower()
+        if transcript:
+            logger.info(f"Transcription for {stream_url}: {transcript[:100]}...")
+        else:
+            logger.warning(f"Empty transcription for {stream_url}; audio may be silent or unintelligible")
+        # The only database access on this path; the lookup pushes its own app context
+        keywords = refresh_flagged_keywords(app)
+        detected_keywords = match_flagged_keywords(transcript_lc, keywords)
+        detections = []
+        if detected_keywords:
+            # Most alerts on a busy stream are repeats, so the detection is only built on a miss
+            if is_duplicate_alert(detected_keywords, transcript, stream_url, transcript_lc):
+                logger.info(f"Skipping duplicate alert for {stream_url}: {detected_keywords}")
             else:
-                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] No transcript for {stream_url}: Audio may be silent or unintelligible")
-                logger.warning(f"Empty transcription for {stream_url}; audio may be silent or unintelligible")
-            keywords = refresh_flagged_keywords(app)
-            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Flagged keywords for {stream_url}: {keywords}")
-            detected_keywords = [kw for kw in keywords if kw in transcript.lower()]
-            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Detected keywords for {stream_url}: {detected_keywords}")
-            detections = []
-            if detected_keywords:
-                detection = {
+                detections.append({
                     "timestamp": datetime.now().isoformat(),
                     "transcript": transcript,
                     "keyword": detected_keywords
-                }
-                
-                if not is_duplicate_alert(detection, stream_url):
-                    detections.append(detection)
-                    logger.info(f"New unique alert for {stream_url}: {detected_keywords}")
-                    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Audio detection for {stream_url}: {detected_keywords}")
-                else:
-                    logger.info(f"Skipping duplicate alert for {stream_url}: {detected_keywords}")
-                    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Skipped duplicate audio detection for {stream_url}: {detected_keywords}")
-            elif transcript:
-                logger.info(f"No keywords detected in transcript for {stream_url}")
-                print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] No keywords detected in transcript for {stream_url}")
+                })
+                logger.info(f"New unique alert for {stream_url}: {detected_keywords}")
+        elif transcript:
+            logger.info(f"No keywords detected in transcript for {stream_url}")
         
-            return detections, transcript
-        except timeout_decorator.TimeoutError:
-            logger.error(f"Transcription timed out for {stream_url} after {TRANSCRIPTION_TIMEOUT}s")
-            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Transcription timeout for {stream_url}")
-            return [], ""
-        except Exception as e:
-            logger.error(f"Error processing audio for {stream_url}: {e}")
-            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Error processing audio for {stream_url}: {e}")
-            return [], ""
+        return detections, transcript
+    except gevent.Timeout:
+        logger.error(f"Transcription timed out for {stream_url} after {TRANSCRIPTION_TIMEOUT}s")
+        return [], ""
+    except Exception as e:
+        logger.error(f"Error processing audio for {stream_url}: {e}")
+        return [], ""
 
 def log_audio_detection(detection, stream_url, app=None):
-    """Log audio detections to database"""
+    """Queue an audio detection to be logged to the database"""
     if app is None:
         app = current_app._get_current_object()
 
+    if not ENABLE_AUDIO_MONITORING:
+        logger.info(f"Audio monitoring disabled; skipping logging for {stream_url}")
+        return
+    try:
+        platform, streamer = get_stream_info(stream_url, app)
+        assignment_id, agent_id = get_stream_assignment(stream_url, app)
+        details = {
+            "keyword": detection.get("keyword"),
+            "transcript": detection.get("transcript"),
+            "timestamp": detection.get("timestamp"),
+            "streamer_name": streamer,
+            "platform": platform,
+            "assigned_agent": agent_id
+        }
+        entry = {
+            "room_url": stream_url,
+            "details": details,
+            "timestamp": datetime.now(),
+            "assigned_agent": agent_id,
+            "assignment_id": assignment_id,
+            "streamer": streamer,
+            "platform": platform
+        }
+    except Exception as e:
+        logger.error(f"Error logging audio detection for {stream_url}: {e}")
+        return
+
+    start_log_flusher(app)
+    try:
+        _log_queue.put_nowait(entry)
+    except Full:
+        logger.warning(f"Audio detection log queue full; writing {stream_url} detection inline")
+        write_audio_detections(app, [entry])
+
+def write_audio_detections(app, entries):
+    """Insert queued audio detections in one transaction and emit their notifications"""
     with app.app_context():
-        enable_audio_monitoring = os.getenv('ENABLE_AUDIO_MONITORING', 'true').lower() == 'true'
-        if not enable_audio_monitoring:
-            logger.info(f"Audio monitoring disabled; skipping logging for {stream_url}")
+        session = db.session()
+        # The notifications below read the new rows, so commit must not expire them
+        expire_on_commit, session.expire_on_commit = session.expire_on_commit, False
+        try:
+            log_entries = [
+                DetectionLog(
+                    room_url=entry["room_url"],
+                    event_type="audio_detection",
+                    details=entry["details"],
+                    timestamp=entry["timestamp"],
+                    assigned_agent=entry["assigned_agent"],
+                    assignment_id=entry["assignment_id"],
+                    read=False
+                )
+                for entry in entries
+            ]
+            with session.no_autoflush:
+                session.add_all(log_entries)
+            session.commit()
+        except Exception as e:
+            logger.error(f"Error logging {len(entries)} audio detections: {e}")
+            session.rollback()
             return
+        finally:
+            session.expire_on_commit = expire_on_commit
+
+    for log_entry, entry in zip(log_entries, entries):
+        notification_data = {
+            "id": log_entry.id,
+            "event_type": log_entry.event_type,
+            "timestamp": log_entry.timestamp.isoformat(),
+            "details": log_entry.details,
+            "read": log_entry.read,
+            "room_url": log_entry.room_url,
+            "streamer": entry["streamer"],
+            "platform": entry["platform"],
+            "assigned_agent": "Unassigned" if not entry["assigned_agent"] else "Agent"
+        }
         try:
-            platform, streamer = get_stream_info(stream_url, app)
-            assignment_id, agent_id = get_stream_assignment(stream_url, app)
-            details = {
-                "keyword": detection.get("keyword"),
-                "transcript": detection.get("transcript"),
-                "timestamp": detection.get("timestamp"),
-                "streamer_name": streamer,
-                "platform": platform,
-                "assigned_agent": agent_id
-            }
-            log_entry = DetectionLog(
-                room_url=stream_url,
-                event_type="audio_detection",
-                details=details,
-                timestamp=datetime.now(),
-                assigned_agent=agent_id,
-                assignment_id=assignment_id,
-                read=False
-            )
-            db.session.add(log_entry)
-            db.session.commit()
-            notification_data = {
-                "id": log_entry.id,
-                "event_type": log_entry.event_type,
-                "timestamp": log_entry.timestamp.isoformat(),
-                "details": log_entry.details,
-                "read": log_entry.read,
-                "room_url": log_entry.room_url,
-                "streamer": streamer,
-                "platform": platform,
-                "assigned_agent": "Unassigned" if not agent_id else "Agent"
-            }
             emit_notification(notification_data)
-            logger.info(f"Logged audio detection for {stream_url}: {details}")
         except Exception as e:
-            logger.error(f"Error logging audio detection for {stream_url}: {e}")
-            db.session.rollback()
+            logger.error(f"Error emitting audio detection for {entry['room_url']}: {e}")
+        logger.info(f"Logged audio detection for {entry['room_url']}: {entry['details']}")
+
+def _take_log_batch(block=True):
+    """Pop up to LOG_BATCH_SIZE queued detections"""
+    batch = []
+    if block:
+        batch.append(_log_queue.get())
+    while len(batch) < LOG_BATCH_SIZE:
+        try:
+            batch.append(_log_queue.get_nowait())
+        except Empty:
+            break
+    return batch
+
+def _flush_audio_detections(app):
+    """Background writer that drains the detection log queue in batches"""
+    while True:
+        write_audio_detections(app, _take_log_batch())
+
+def start_log_flusher(app):
+    """Start the detection log writer greenlet if it is not already running"""
+    global _log_flusher
+    if _log_flusher is None or _log_flusher.dead:
+        _log_flusher = gevent.spawn(_flush_audio_detections, app)
+    return _log_flusher
+
+def drain_audio_detections(app):
+    """Write every queued detection now, e.g. before shutdown"""
+    batch = _take_log_batch(block=False)
+    while batch:
+        write_audio_detections(app, batch)
+        batch = _take_log_batch(block=False)
 
 def clear_alert_cache(stream_url=None):
     """Clear alert cache for a specific stream or all streams"""
@@ -402,15 +544,20 @@ def get_cache_stats():
     
     stats = {
         "total_streams": len(_alert_cache),
-        "total_cached_alerts": sum(len(cache) for cache in _alert_cache.values()),
+        "total_cached_alerts": sum(len(cache['entries']) for cache in _alert_cache.values()),
         "streams": {}
     }
     
+    # Cached timestamps are monotonic; convert them to wall-clock time for reporting
+    wall_offset = time.time() - time.monotonic()
     for stream_url, cache in _alert_cache.items():
+        entries = cache['entries']
+        oldest = min((data['timestamp'] for data in entries.values()), default=None)
+        newest = max((data['timestamp'] for data in entries.values()), default=None)
         stats["streams"][stream_url] = {
-            "cached_alerts": len(cache),
-            "oldest_alert": min((data['timestamp'] for data in cache.values()), default=None),
-            "newest_alert": max((data['timestamp'] for data in cache.values()), default=None)
+            "cached_alerts": len(entries),
+            "oldest_alert": datetime.fromtimestamp(oldest + wall_offset) if oldest is not None else None,
+            "newest_alert": datetime.fromtimestamp(newest + wall_offset) if newest is not None else None
         }
     
     return stats
@@ -422,6 +569,7 @@ def cleanup_audio_resources(app=None):
 
     global _whisper_model
     try:
+        drain_audio_detections(app)
         if _whisper_model is not None:
             del _whisper_model
             _whisper_model = None
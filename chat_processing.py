@@ -1,20 +1,41 @@
+import bisect
+import http.cookiejar
 import logging
-import re
+import string
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
-from models import DetectionLog, Stream, ChaturbateStream, StripchatStream
+from models import DetectionLog
 from extensions import db
 from utils.notifications import emit_notification
+from utils.keyword_matching import get_keyword_matcher
+from utils.stream_lookup import cached_stream_lookup, lookup_stream
 import random
 import time
+import gevent
 from gevent.lock import Semaphore
 import urllib3
 from dotenv import load_dotenv
 import os
-import hashlib
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
+from functools import lru_cache
 from difflib import SequenceMatcher
 
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:
+    fuzz = process = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load environment variables
 load_dotenv()
 
@@ -26,20 +47,100 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class ProxyStats:
+    """Success and failure counts for one proxy"""
+    __slots__ = ('successes', 'failures')
+    
+    def __init__(self):
+        self.successes = 0
+        self.failures = 0
+    
+    @property
+    def score(self):
+        return self.successes - self.failures
+
 # Proxy configuration
 PROXY_LIST = []
 PROXY_LIST_LAST_UPDATED = None
 PROXY_UPDATE_INTERVAL = 60
 FAILED_PROXIES = set()
-PROXY_SUCCESS_COUNT = defaultdict(int)
-PROXY_FAILURE_COUNT = defaultdict(int)
+PROXY_STATS = defaultdict(ProxyStats)
+PROXY_WEIGHT_BASE = 5  # Added to each proxy's score so untried and slightly negative proxies still get traffic
+_AVAILABLE_PROXIES = set()  # PROXY_LIST minus FAILED_PROXIES, kept in step with both
+CHAT_FETCH_MAX_ATTEMPTS = 30
+CHAT_HEDGE_WIDTH = int(os.getenv('CHAT_HEDGE_WIDTH', 5))  # Proxies raced per round of a chat fetch
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Shared HTTP session for chat and proxy-list requests; the adapter keeps one keep-alive pool per proxy
+CHAT_POOL_SIZE = int(os.getenv('CHAT_POOL_SIZE', 100))
+_chat_session = requests.Session()
+_chat_adapter = HTTPAdapter(pool_connections=CHAT_POOL_SIZE, pool_maxsize=CHAT_POOL_SIZE, max_retries=0)
+_chat_session.mount('http://', _chat_adapter)
+_chat_session.mount('https://', _chat_adapter)
+# Pooling is only for connection reuse; never carry cookies from one request to the next
+_chat_session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+
+
+
 # External dependencies
 _sentiment_analyzer = None
 ENABLE_CHAT_MONITORING = None
 NEGATIVE_SENTIMENT_THRESHOLD = None
 
+# Message normalization: digits collapse to '#', which the punctuation pass then strips,
+# so both are deleted in a single translate
+_STRIP_TABLE = str.maketrans('', '', '0123456789!@#$%^&*()_+=[]{}|;:,.<>?')
+
+@lru_cache(maxsize=4096)
+def normalize_message(message):
+    """Normalize message for similarity comparison"""
+    return ' '.join(message.lower().split()).translate(_STRIP_TABLE)
+
+@lru_cache(maxsize=4096)
+def char_signature(text):
+    """64-bit fingerprint of the characters present in text, one bit per character bucket"""
+    signature = 0
+    for ch in set(text):
+        signature |= 1 << (ord(ch) & 63)
+    return signature
+
+def may_carry_sentiment(text, lexicon):
+    """Whether VADER could score lowercased text as non-neutral
+
+    VADER only scores words found in its lexicon (emoji are first translated to
+    words), so ASCII text without any lexicon token always gets a compound of 0.
+    """
+    if not text.isascii():
+        return True
+    for token in text.split():
+        if token in lexicon or token.strip(string.punctuation) in lexicon:
+            return True
+    return False
+
+class RecentHashSet:
+    """Set of the most recent message hashes; adding past maxlen forgets the oldest"""
+    def __init__(self, maxlen=1000):
+        self._order = deque(maxlen=maxlen)
+        self._members = set()
+    
+    def __contains__(self, message_hash):
+        return message_hash in self._members
+    
+    def __len__(self):
+        return len(self._members)
+    
+    def add(self, message_hash):
+        if message_hash in self._members:
+            return
+        if len(self._order) == self._order.maxlen:
+            self._members.discard(self._order[0])
+        self._order.append(message_hash)
+        self._members.add(message_hash)
+
+NS_PER_SECOND = 1_000_000_000
+RECENT_ALERTS_MAXLEN = 2048  # Hard cap per room and alert type, on top of the rate limit
+MAX_TRACKED_ROOMS = 1024  # Rooms whose alerts and message hashes are kept; the least recently alerted is dropped first
+
 # Smart filtering system
 class SmartChatFilter:
     def __init__(self, similarity_threshold=0.8, time_window_minutes=5, max_alerts_per_keyword=3):
@@ -47,33 +148,68 @@ class SmartChatFilter:
         self.time_window = timedelta(minutes=time_window_minutes)
         self.max_alerts_per_keyword = max_alerts_per_keyword
         
-        self.recent_alerts = defaultdict(lambda: defaultdict(deque))
-        self.message_hashes = defaultdict(set)
+        # Reads for unseen rooms don't allocate; entries are created only on insert, least recent first
+        self.recent_alerts = OrderedDict()
+        self.message_hashes = OrderedDict()
+        
+    @staticmethod
+    def _room_entry(rooms, room_url, factory):
+        """Return the room's entry, creating it and evicting the least recently alerted room past MAX_TRACKED_ROOMS"""
+        entry = rooms.get(room_url)
+        if entry is None:
+            if len(rooms) >= MAX_TRACKED_ROOMS:
+                rooms.popitem(last=False)
+            entry = rooms[room_url] = factory()
+        else:
+            rooms.move_to_end(room_url)
+        return entry
         
     def _hash_message(self, message, username):
-        """Create a hash of the message content and user for exact duplicate detection"""
+        """Create an integer fingerprint of the message content and user for exact duplicate detection"""
         content = f"{username}:{message}".lower().strip()
-        return hashlib.md5(content.encode()).hexdigest()
+        if xxhash is not None:
+            return xxhash.xxh3_64_intdigest(content)
+        return hash(content)
     
     def _normalize_message(self, message):
         """Normalize message for similarity comparison"""
-        normalized = re.sub(r'\s+', ' ', message.lower().strip())
-        normalized = re.sub(r'[0-9]+', '#', normalized)
-        normalized = re.sub(r'[!@#$%^&*()_+=\[\]{}|;:,.<>?]+', '', normalized)
-        return normalized
+        return normalize_message(message)
+    
+    def _normalized_similarity(self, norm1, norm2):
+        """Calculate similarity between two already-normalized messages"""
+        if fuzz is not None:
+            return fuzz.ratio(norm1, norm2) / 100.0
+        return SequenceMatcher(None, norm1, norm2).ratio()
+    
+    def _is_similar(self, norm1, norm2, threshold):
+        """Check whether two normalized messages reach threshold, exiting early where possible"""
+        total = len(norm1) + len(norm2)
+        # The ratio can never exceed 2 * min(len) / total, so lopsided pairs are rejected unscored
+        if total and 2 * min(len(norm1), len(norm2)) / total < threshold:
+            return False
+        # Each character bucket used by only one message costs at least one edit, so
+        # the XOR popcount of the signatures bounds the distance from below
+        if total and 1 - (char_signature(norm1) ^ char_signature(norm2)).bit_count() / total < threshold:
+            return False
+        if fuzz is not None:
+            cutoff = threshold * 100
+            return fuzz.ratio(norm1, norm2, score_cutoff=cutoff) >= cutoff
+        matcher = SequenceMatcher(None, norm1, norm2)
+        return matcher.quick_ratio() >= threshold and matcher.ratio() >= threshold
     
     def _calculate_similarity(self, msg1, msg2):
         """Calculate similarity between two messages"""
-        norm1 = self._normalize_message(msg1)
-        norm2 = self._normalize_message(msg2)
-        return SequenceMatcher(None, norm1, norm2).ratio()
+        return self._normalized_similarity(self._normalize_message(msg1), self._normalize_message(msg2))
     
     def _is_similar_to_recent(self, room_url, alert_type, new_message, new_username):
         """Check if the new alert is similar to recent ones"""
-        recent = self.recent_alerts[room_url][alert_type]
+        recent = self.recent_alerts.get(room_url, {}).get(alert_type, ())
+        if not recent:
+            return False
+        normalized = self._normalize_message(new_message)
         
         for alert in recent:
-            if self._calculate_similarity(new_message, alert['message']) >= self.similarity_threshold:
+            if self._is_similar(normalized, alert['normalized'], self.similarity_threshold):
                 if alert_type == 'keyword':
                     if new_username == alert['username']:
                         return True
@@ -84,31 +220,50 @@ class SmartChatFilter:
     
     def _cleanup_old_alerts(self, room_url):
         """Remove alerts older than the time window"""
-        current_time = datetime.now()
+        cutoff_ns = time.monotonic_ns() - int(self.time_window.total_seconds() * 1e9)
+        
+        room_alerts = self.recent_alerts.get(room_url)
+        if room_alerts is None:
+            return
         
-        for alert_type in list(self.recent_alerts[room_url].keys()):
-            alerts = self.recent_alerts[room_url][alert_type]
+        for alert_type in list(room_alerts.keys()):
+            alerts = room_alerts[alert_type]
             
-            while alerts and (current_time - alerts[0]['timestamp']) > self.time_window:
+            while alerts and alerts[0]['timestamp_ns'] < cutoff_ns:
                 alerts.popleft()
             
             if not alerts:
-                del self.recent_alerts[room_url][alert_type]
+                del room_alerts[alert_type]
         
-        if not self.recent_alerts[room_url]:
+        if not room_alerts:
             del self.recent_alerts[room_url]
     
-    def should_alert(self, room_url, detection):
-        """Determine if an alert should be sent based on smart filtering"""
-        current_time = datetime.now()
+    def prepare_message(self, room_url, message, username):
+        """Expire old alerts and fingerprint a message once; returns None for an exact duplicate"""
+        self._cleanup_old_alerts(room_url)
+        message_hash = self._hash_message(message, username)
+        if message_hash in self.message_hashes.get(room_url, ()):
+            logger.debug(f"Exact duplicate message detected for {room_url}: {username} - {message[:50]}...")
+            return None
+        return message_hash
+    
+    def should_alert(self, room_url, detection, message_hash=None):
+        """Determine if an alert should be sent based on smart filtering
+
+        Callers checking several detections from one message pass the hash from
+        prepare_message so cleanup and hashing run once per message.
+        """
+        now_ns = time.monotonic_ns()
         message = detection.get('message', '')
         username = detection.get('username', 'unknown')
         alert_type = detection.get('type', 'unknown')
         
-        self._cleanup_old_alerts(room_url)
-        
-        message_hash = self._hash_message(message, username)
-        if message_hash in self.message_hashes[room_url]:
+        if message_hash is None:
+            message_hash = self.prepare_message(room_url, message, username)
+            if message_hash is None:
+                return False
+        elif message_hash in self.message_hashes.get(room_url, ()):
+            # An earlier detection from the same message already alerted
             logger.debug(f"Exact duplicate message detected for {room_url}: {username} - {message[:50]}...")
             return False
         
@@ -116,55 +271,54 @@ class SmartChatFilter:
             logger.debug(f"Similar message detected for {room_url}: {username} - {message[:50]}...")
             return False
         
-        recent_count = len(self.recent_alerts[room_url][alert_type])
+        recent = self.recent_alerts.get(room_url, {}).get(alert_type, ())
+        recent_count = len(recent)
         if recent_count >= self.max_alerts_per_keyword:
             logger.debug(f"Rate limit reached for {alert_type} alerts in {room_url}")
             return False
         
         if alert_type == 'keyword':
             keyword = detection.get('keyword', '')
-            for alert in self.recent_alerts[room_url][alert_type]:
+            for alert in recent:
                 if (alert.get('keyword') == keyword and 
                     alert.get('username') == username and
-                    (current_time - alert['timestamp']).total_seconds() < 300):
+                    now_ns - alert['timestamp_ns'] < 300 * NS_PER_SECOND):
                     logger.debug(f"Same keyword '{keyword}' from same user '{username}' within 5 minutes")
                     return False
         
         elif alert_type == 'sentiment':
             sentiment_score = detection.get('sentiment_score', 0)
-            for alert in self.recent_alerts[room_url][alert_type]:
+            for alert in recent:
                 if (alert.get('username') == username and
                     abs(alert.get('sentiment_score', 0) - sentiment_score) < 0.1 and
-                    (current_time - alert['timestamp']).total_seconds() < 600):
+                    now_ns - alert['timestamp_ns'] < 600 * NS_PER_SECOND):
                     logger.debug(f"Similar sentiment score from same user '{username}' within 10 minutes")
                     return False
         
         alert_data = {
             'message': message,
+            'normalized': self._normalize_message(message),
             'username': username,
-            'timestamp': current_time,
+            'timestamp_ns': now_ns,
             'keyword': detection.get('keyword'),
             'sentiment_score': detection.get('sentiment_score')
         }
         
-        self.recent_alerts[room_url][alert_type].append(alert_data)
-        self.message_hashes[room_url].add(message_hash)
-        
-        if len(self.message_hashes[room_url]) > 1000:
-            old_hashes = list(self.message_hashes[room_url])[:100]
-            for hash_to_remove in old_hashes:
-                self.message_hashes[room_url].discard(hash_to_remove)
+        room_alerts = self._room_entry(self.recent_alerts, room_url, dict)
+        room_alerts.setdefault(alert_type, deque(maxlen=RECENT_ALERTS_MAXLEN)).append(alert_data)
+        self._room_entry(self.message_hashes, room_url, RecentHashSet).add(message_hash)
         
         return True
     
     def get_stats(self, room_url=None):
         """Get filtering statistics"""
         if room_url:
+            room_alerts = self.recent_alerts.get(room_url, {})
             return {
                 'room_url': room_url,
-                'active_alert_types': list(self.recent_alerts[room_url].keys()),
-                'total_recent_alerts': sum(len(alerts) for alerts in self.recent_alerts[room_url].values()),
-                'unique_message_hashes': len(self.message_hashes[room_url])
+                'active_alert_types': list(room_alerts.keys()),
+                'total_recent_alerts': sum(len(alerts) for alerts in room_alerts.values()),
+                'unique_message_hashes': len(self.message_hashes.get(room_url, ()))
             }
         else:
             return {
@@ -208,11 +362,28 @@ def load_sentiment_analyzer():
         _sentiment_analyzer = SentimentIntensityAnalyzer()
     return _sentiment_analyzer
 
+def _prune_proxy_pools(proxies):
+    """Close pooled connections to proxies that are no longer in the list"""
+    keep = {f"http://{proxy}" for proxy in proxies}
+    for proxy_url in list(_chat_adapter.proxy_manager):
+        manager = _chat_adapter.proxy_manager.pop(proxy_url, None) if proxy_url not in keep else None
+        if manager is not None:
+            manager.clear()
+
+def _reset_available_proxies():
+    """Recompute the proxies that are listed and not marked as failed"""
+    global _AVAILABLE_PROXIES
+    _AVAILABLE_PROXIES = set(PROXY_LIST) - FAILED_PROXIES
+
+def _mark_proxy_failed(proxy):
+    FAILED_PROXIES.add(proxy)
+    _AVAILABLE_PROXIES.discard(proxy)
+
 def update_proxy_list():
     """Fetch fresh proxies from free API services"""
     global PROXY_LIST, PROXY_LIST_LAST_UPDATED, FAILED_PROXIES
     try:
-        response = requests.get(
+        response = _chat_session.get(
             "https://api.proxyscrape.com/v2/?request=displayproxies&protocol=http&timeout=10000&country=all&ssl=all&anonymity=all",
             timeout=20
         )
@@ -222,10 +393,12 @@ def update_proxy_list():
                 PROXY_LIST = proxies
                 PROXY_LIST_LAST_UPDATED = time.time()
                 FAILED_PROXIES.clear()
+                _reset_available_proxies()
+                _prune_proxy_pools(proxies)
                 logger.info(f"Updated proxy list with {len(PROXY_LIST)} proxies")
                 return proxies
                 
-        response = requests.get(
+        response = _chat_session.get(
             "https://www.proxy-list.download/api/v1/get?type=http",
             timeout=20
         )
@@ -235,6 +408,8 @@ def update_proxy_list():
                 PROXY_LIST = proxies
                 PROXY_LIST_LAST_UPDATED = time.time()
                 FAILED_PROXIES.clear()
+                _reset_available_proxies()
+                _prune_proxy_pools(proxies)
                 logger.info(f"Updated proxy list with {len(PROXY_LIST)} proxies")
                 return proxies
                 
@@ -244,6 +419,28 @@ def update_proxy_list():
         logger.error(f"Failed to update proxy list: {str(e)}")
         return None
 
+def _proxy_score(proxy):
+    """Successes minus failures for a proxy; untried proxies score 0"""
+    stats = PROXY_STATS.get(proxy)
+    return stats.score if stats is not None else 0
+
+def _pick_proxy(used_proxies):
+    """Sample an available proxy not yet tried by the caller, weighted by score, or None
+
+    One pass of weighted reservoir sampling: each proxy replaces the pick with
+    probability weight / running total, so no candidate or weight list is built.
+    """
+    selected = None
+    total = 0
+    for proxy in _AVAILABLE_PROXIES:
+        if proxy in used_proxies:
+            continue
+        weight = max(1, _proxy_score(proxy) + PROXY_WEIGHT_BASE)
+        total += weight
+        if random.random() * total < weight:
+            selected = proxy
+    return selected
+
 def get_random_proxy(used_proxies=None):
     """Select a random proxy from the proxy list, avoiding recently failed ones."""
     global PROXY_LIST, PROXY_LIST_LAST_UPDATED, FAILED_PROXIES
@@ -259,26 +456,26 @@ def get_random_proxy(used_proxies=None):
         if new_proxies and len(new_proxies) >= 100:
             PROXY_LIST = new_proxies
             PROXY_LIST_LAST_UPDATED = current_time
+            _reset_available_proxies()
             logger.info(f"Updated proxy list with {len(PROXY_LIST)} proxies")
         elif not PROXY_LIST:
             PROXY_LIST = [
                 "52.67.10.183:80",
                 "200.250.131.218:80",
             ]
+            _reset_available_proxies()
             logger.warning("Using static proxy list as fallback")
     
     if PROXY_LIST:
-        available_proxies = [p for p in PROXY_LIST if p not in FAILED_PROXIES and p not in used_proxies]
-        if not available_proxies:
+        selected_proxy = _pick_proxy(used_proxies)
+        if selected_proxy is None:
             logger.warning("No available proxies after filtering failed/used ones, clearing failed proxies")
             FAILED_PROXIES.clear()
-            available_proxies = [p for p in PROXY_LIST if p not in used_proxies]
+            _reset_available_proxies()
+            selected_proxy = _pick_proxy(used_proxies)
         
-        if available_proxies:
-            proxy_scores = [(p, PROXY_SUCCESS_COUNT[p] - PROXY_FAILURE_COUNT[p]) for p in available_proxies]
-            proxy_scores.sort(key=lambda x: x[1], reverse=True)
-            selected_proxy = proxy_scores[0][0] if proxy_scores else random.choice(available_proxies)
-            logger.debug(f"Selected proxy {selected_proxy} with score {PROXY_SUCCESS_COUNT[selected_proxy] - PROXY_FAILURE_COUNT[selected_proxy]}")
+        if selected_proxy is not None:
+            logger.debug(f"Selected proxy {selected_proxy} with score {_proxy_score(selected_proxy)}")
             return {
                 "http": f"http://{selected_proxy}",
                 "https": f"http://{selected_proxy}"
@@ -292,68 +489,32 @@ def refresh_flagged_keywords(app):
         from models import ChatKeyword
         keywords = [kw.keyword.lower() for kw in ChatKeyword.query.all()]
     logger.debug(f"Retrieved {len(keywords)} flagged keywords")
+    get_keyword_matcher(keywords)
     return keywords
 
+def _lookup_stream(room_url, app):
+    """Return the StreamLookup for a room or M3U8 URL, pushing an app context only on a cache miss"""
+    lookup = cached_stream_lookup(room_url)
+    if lookup is None:
+        with app.app_context():
+            lookup = lookup_stream(room_url)
+        if lookup is None:
+            logger.warning(f"No stream found for URL: {room_url}")
+    return lookup
+
 def get_stream_info(room_url, app):
-    """Identify platform, streamer, and broadcaster UID from URL, prioritizing room_url"""
-    with app.app_context():
-        stream = Stream.query.filter_by(room_url=room_url).first()
-        if stream:
-            logger.debug(f"Found stream by room_url: {room_url}, type: {stream.type}, username: {stream.streamer_username}")
-            if stream.type.lower() == 'chaturbate':
-                cb_stream = ChaturbateStream.query.filter_by(id=stream.id).first()
-                broadcaster_uid = cb_stream.broadcaster_uid if cb_stream else None
-                return stream.type.lower(), stream.streamer_username, broadcaster_uid
-            return stream.type.lower(), stream.streamer_username, None
-        
-        cb_stream = ChaturbateStream.query.filter_by(chaturbate_m3u8_url=room_url).first()
-        if cb_stream:
-            stream = Stream.query.get(cb_stream.id)
-            logger.debug(f"Found stream by chaturbate_m3u8_url: {room_url}, type: chaturbate, username: {stream.streamer_username}")
-            return 'chaturbate', stream.streamer_username, cb_stream.broadcaster_uid
-        
-        sc_stream = StripchatStream.query.filter_by(stripchat_m3u8_url=room_url).first()
-        if sc_stream:
-            stream = Stream.query.get(sc_stream.id)
-            logger.debug(f"Found stream by stripchat_m3u8_url: {room_url}, type: stripchat, username: {stream.streamer_username}")
-            return 'stripchat', stream.streamer_username, None
-        
-        logger.warning(f"No stream found for URL: {room_url}")
+    """Identify platform, streamer, and broadcaster UID from URL"""
+    lookup = _lookup_stream(room_url, app)
+    if lookup is None:
         return 'unknown', 'unknown', None
+    return lookup.platform, lookup.streamer, lookup.broadcaster_uid
 
 def get_stream_assignment(room_url, app):
     """Get assignment info for a stream"""
-    from sqlalchemy.orm import joinedload
-    with app.app_context():
-        stream = Stream.query.filter_by(room_url=room_url).first()
-        if not stream:
-            cb_stream = ChaturbateStream.query.filter_by(chaturbate_m3u8_url=room_url).first()
-            if cb_stream:
-                stream = Stream.query.get(cb_stream.id)
-            else:
-                sc_stream = StripchatStream.query.filter_by(stripchat_m3u8_url=room_url).first()
-                if sc_stream:
-                    stream = Stream.query.get(sc_stream.id)
-        
-        if not stream:
-            logger.warning(f"No stream found for URL: {room_url}")
-            return None, None
-        
-        from models import Assignment
-        query = Assignment.query.options(
-            joinedload(Assignment.agent),
-            joinedload(Assignment.stream)
-        ).filter_by(stream_id=stream.id)
-        
-        assignments = query.all()
-        
-        if not assignments:
-            logger.info(f"No assignments found for stream: {room_url}")
-            return None, None
-        
-        assignment = assignments[0]
-        agent_id = assignment.agent_id
-        return assignment.id, agent_id
+    lookup = _lookup_stream(room_url, app)
+    if lookup is None:
+        return None, None
+    return lookup.assignment_id, lookup.agent_id
 
 def fetch_chaturbate_room_uid(streamer_username):
     """Fetch Chaturbate room UID and broadcaster UID"""
@@ -371,7 +532,7 @@ def fetch_chaturbate_room_uid(streamer_username):
     while attempts < max_attempts:
         proxy_dict, selected_proxy = get_random_proxy()
         try:
-            response = requests.get(
+            response = _chat_session.get(
                 url,
                 headers=headers,
                 proxies=proxy_dict,
@@ -392,6 +553,64 @@ def fetch_chaturbate_room_uid(streamer_username):
     logger.error(f"Failed to fetch Chaturbate room UID for {streamer_username} after {max_attempts} attempts")
     return None, None
 
+def _hedged_proxy_request(send, description):
+    """Race send(proxy_dict) through CHAT_HEDGE_WIDTH proxies at a time and return the first success
+
+    Every failed proxy counts as one attempt; losing requests are killed once one succeeds.
+    Returns (result, proxy), or (None, None) after CHAT_FETCH_MAX_ATTEMPTS failures.
+    """
+    attempts = 0
+    used_proxies = set()
+    
+    while attempts < CHAT_FETCH_MAX_ATTEMPTS:
+        pending = {}
+        for _ in range(min(CHAT_HEDGE_WIDTH, CHAT_FETCH_MAX_ATTEMPTS - attempts)):
+            proxy_dict, selected_proxy = get_random_proxy(used_proxies)
+            if not proxy_dict:
+                break
+            used_proxies.add(selected_proxy)
+            pending[gevent.spawn(send, proxy_dict)] = selected_proxy
+        if not pending:
+            logger.error(f"No proxy available for attempt {attempts + 1}")
+            attempts += 1
+            continue
+        
+        while pending:
+            for greenlet in gevent.wait(list(pending), count=1):
+                selected_proxy = pending.pop(greenlet)
+                if greenlet.successful():
+                    gevent.killall(list(pending), block=False)
+                    PROXY_STATS[selected_proxy].successes += 1
+                    return greenlet.value, selected_proxy
+                attempts += 1
+                PROXY_STATS[selected_proxy].failures += 1
+                _mark_proxy_failed(selected_proxy)
+                logger.warning(f"Attempt {attempts} failed for {description} with proxy {selected_proxy}: {greenlet.exception}")
+        
+        if attempts < CHAT_FETCH_MAX_ATTEMPTS:
+            logger.info("Too many proxy failures, forcing proxy list refresh")
+            time.sleep(1)
+            update_proxy_list()
+            used_proxies.clear()
+    return None, None
+
+def _parse_json(response):
+    """Decode a JSON response body, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+# Chaturbate room history form body, encoded once; only the broadcaster UID is filled in per request
+_CB_CHAT_BODY_TEMPLATE = (
+    '------geckoformboundary428c342290b0a9092e9dcf7e4e1d5b9\r\n'
+    'Content-Disposition: form-data; name="topics"\r\n\r\n'
+    '{"RoomMessageTopic#RoomMessageTopic:__UID__":{"broadcaster_uid":"__UID__"}}\r\n'
+    '------geckoformboundary428c342290b0a9092e9dcf7e4e1d5b9\r\n'
+    'Content-Disposition: form-data; name="csrfmiddlewaretoken"\r\n\r\n'
+    'NdFODN04i4jCUKVTPs3JyAwxsVnuxiy0\r\n'
+    '------geckoformboundary428c342290b0a9092e9dcf7e4e1d5b9--\r\n'
+).encode()
+
 def fetch_chaturbate_chat(room_url, streamer, broadcaster_uid):
     """Fetch Chaturbate chat messages using proxies"""
     if not broadcaster_uid:
@@ -409,63 +628,38 @@ def fetch_chaturbate_chat(room_url, streamer, broadcaster_uid):
         'Origin': 'https://chaturbate.com',
         'Connection': 'keep-alive',
     }
-    data = (
-        '------geckoformboundary428c342290b0a9092e9dcf7e4e1d5b9\r\n'
-        f'Content-Disposition: form-data; name="topics"\r\n\r\n'
-        f'{{"RoomMessageTopic#RoomMessageTopic:{broadcaster_uid}":{{"broadcaster_uid":"{broadcaster_uid}"}}}}\r\n'
-        '------geckoformboundary428c342290b0a9092e9dcf7e4e1d5b9\r\n'
-        'Content-Disposition: form-data; name="csrfmiddlewaretoken"\r\n\r\n'
-        'NdFODN04i4jCUKVTPs3JyAwxsVnuxiy0\r\n'
-        '------geckoformboundary428c342290b0a9092e9dcf7e4e1d5b9--\r\n'
-    )
-    max_attempts = 30
-    attempts = 0
-    used_proxies = set()
+    data = _CB_CHAT_BODY_TEMPLATE.replace(b'__UID__', str(broadcaster_uid).encode())
+    topic = f"RoomMessageTopic#RoomMessageTopic:{broadcaster_uid}"
     
-    while attempts < max_attempts:
-        proxy_dict, selected_proxy = get_random_proxy(used_proxies)
-        if not proxy_dict:
-            logger.error(f"No proxy available for attempt {attempts + 1}")
-            attempts += 1
-            continue
-        
-        used_proxies.add(selected_proxy)
-        try:
-            response = requests.post(
-                url,
-                headers=headers,
-                data=data,
-                proxies=proxy_dict,
-                timeout=15,
-                verify=False
-            )
-            response.raise_for_status()
-            PROXY_SUCCESS_COUNT[selected_proxy] += 1
-            chat_data = response.json()
-            messages = []
-            for key, msg_data in chat_data.items():
-                if f"RoomMessageTopic#RoomMessageTopic:{broadcaster_uid}" in msg_data:
-                    msg = msg_data[f"RoomMessageTopic#RoomMessageTopic:{broadcaster_uid}"]
-                    messages.append({
-                        "username": msg.get("from_user", {}).get("username", "unknown"),
-                        "message": msg.get("message", ""),
-                        "timestamp": datetime.now().isoformat()
-                    })
-            logger.info(f"Fetched {len(messages)} Chaturbate chat messages for {streamer} at {room_url} using proxy {selected_proxy}")
-            return messages
-        except Exception as e:
-            attempts += 1
-            PROXY_FAILURE_COUNT[selected_proxy] += 1
-            FAILED_PROXIES.add(selected_proxy)
-            logger.warning(f"Attempt {attempts} failed for Chaturbate chat fetch for {streamer} at {room_url} with proxy {selected_proxy}: {e}")
-            if attempts < max_attempts:
-                time.sleep(1)
-            if attempts % 5 == 0 and attempts < max_attempts:
-                logger.info("Too many proxy failures, forcing proxy list refresh")
-                update_proxy_list()
-                used_proxies.clear()
-    logger.error(f"Failed to fetch Chaturbate chat for {streamer} at {room_url} after {max_attempts} attempts")
-    return []
+    def send(proxy_dict):
+        response = _chat_session.post(
+            url,
+            headers=headers,
+            data=data,
+            proxies=proxy_dict,
+            timeout=15,
+            verify=False
+        )
+        response.raise_for_status()
+        return _parse_json(response)
+    
+    chat_data, selected_proxy = _hedged_proxy_request(send, f"Chaturbate chat fetch for {streamer} at {room_url}")
+    if chat_data is None:
+        logger.error(f"Failed to fetch Chaturbate chat for {streamer} at {room_url} after {CHAT_FETCH_MAX_ATTEMPTS} attempts")
+        return []
+    
+    fetched_at = datetime.now().isoformat()
+    messages = []
+    for key, msg_data in chat_data.items():
+        if topic in msg_data:
+            msg = msg_data[topic]
+            messages.append({
+                "username": msg.get("from_user", {}).get("username", "unknown"),
+                "message": msg.get("message", ""),
+                "timestamp": fetched_at
+            })
+    logger.info(f"Fetched {len(messages)} Chaturbate chat messages for {streamer} at {room_url} using proxy {selected_proxy}")
+    return messages
 
 def fetch_stripchat_chat(room_url, streamer):
     """Fetch Stripchat chat messages using proxies"""
@@ -483,55 +677,37 @@ def fetch_stripchat_chat(room_url, streamer):
         'Sec-Fetch-Site': 'same-origin',
         'Connection': 'keep-alive',
     }
-    max_attempts = 30
-    attempts = 0
-    used_proxies = set()
     
-    while attempts < max_attempts:
-        proxy_dict, selected_proxy = get_random_proxy(used_proxies)
-        if not proxy_dict:
-            logger.error(f"No proxy available for attempt {attempts + 1}")
-            attempts += 1
-            continue
-        
-        used_proxies.add(selected_proxy)
-        try:
-            response = requests.get(
-                url,
-                headers=headers,
-                proxies=proxy_dict,
-                timeout=15,
-                verify=False
-            )
-            response.raise_for_status()
-            PROXY_SUCCESS_COUNT[selected_proxy] += 1
-            chat_data = response.json().get("messages", [])
-            messages = []
-            for msg in chat_data:
-                message_type = msg.get("type", "")
-                details = msg.get("details", {})
-                body = details.get("body", "")
-                if message_type == "text" or (message_type == "tip" and body):
-                    messages.append({
-                        "username": msg.get("userData", {}).get("username", "unknown"),
-                        "message": body,
-                        "timestamp": msg.get("createdAt", datetime.now().isoformat())
-                    })
-            logger.info(f"Fetched {len(messages)} Stripchat chat messages for {streamer} at {room_url} using proxy {selected_proxy}")
-            return messages
-        except Exception as e:
-            attempts += 1
-            PROXY_FAILURE_COUNT[selected_proxy] += 1
-            FAILED_PROXIES.add(selected_proxy)
-            logger.warning(f"Attempt {attempts} failed for Stripchat chat fetch for {streamer} at {room_url} with proxy {selected_proxy}: {e}")
-            if attempts < max_attempts:
-                time.sleep(1)
-            if attempts % 5 == 0 and attempts < max_attempts:
-                logger.info("Too many proxy failures, forcing proxy list refresh")
-                update_proxy_list()
-                used_proxies.clear()
-    logger.error(f"Failed to fetch Stripchat chat for {streamer} at {room_url} after {max_attempts} attempts")
-    return []
+    def send(proxy_dict):
+        response = _chat_session.get(
+            url,
+            headers=headers,
+            proxies=proxy_dict,
+            timeout=15,
+            verify=False
+        )
+        response.raise_for_status()
+        return _parse_json(response)
+    
+    chat_json, selected_proxy = _hedged_proxy_request(send, f"Stripchat chat fetch for {streamer} at {room_url}")
+    if chat_json is None:
+        logger.error(f"Failed to fetch Stripchat chat for {streamer} at {room_url} after {CHAT_FETCH_MAX_ATTEMPTS} attempts")
+        return []
+    
+    fetched_at = datetime.now().isoformat()
+    messages = []
+    for msg in chat_json.get("messages", []):
+        message_type = msg.get("type", "")
+        details = msg.get("details", {})
+        body = details.get("body", "")
+        if message_type == "text" or (message_type == "tip" and body):
+            messages.append({
+                "username": msg.get("userData", {}).get("username", "unknown"),
+                "message": body,
+                "timestamp": msg.get("createdAt", fetched_at)
+            })
+    logger.info(f"Fetched {len(messages)} Stripchat chat messages for {streamer} at {room_url} using proxy {selected_proxy}")
+    return messages
 
 # chat_processing.py
 def fetch_chat_messages(room_url, app):
@@ -568,30 +744,44 @@ def process_chat_messages(messages, room_url, app):
         detected = []
         now = datetime.now()
         analyzer = load_sentiment_analyzer()
+        lexicon = getattr(analyzer, 'lexicon', None)
+        # Neutral messages score 0, which can only raise an alert when the threshold is positive
+        skip_neutral = lexicon is not None and NEGATIVE_SENTIMENT_THRESHOLD <= 0
+        match_keywords = get_keyword_matcher(keywords)
         
         for msg in messages:
-            text = msg.get("message", "").lower()
+            original = msg.get("message", "")
+            text = original.lower()
             user = msg.get("username", "unknown")
             timestamp = msg.get("timestamp", now.isoformat())
             
-            for keyword in keywords:
-                if keyword in text:
-                    detection = {
-                        "type": "keyword",
-                        "keyword": keyword,
-                        "message": text,
-                        "username": user,
-                        "timestamp": timestamp
-                    }
-                    
-                    if smart_filter.should_alert(room_url, detection):
-                        detected.append(detection)
-                        logger.info(f"Keyword alert passed smart filter: {keyword} from {user}")
-                    else:
-                        logger.debug(f"Keyword alert filtered out: {keyword} from {user}")
+            # Exact repeats would be rejected by the smart filter anyway, so skip the scans entirely
+            message_hash = smart_filter.prepare_message(room_url, text, user)
+            if message_hash is None:
+                continue
+            
+            # One scan finds every flagged keyword in the message; each is reported once
+            for keyword in dict.fromkeys(match_keywords(text)):
+                detection = {
+                    "type": "keyword",
+                    "keyword": keyword,
+                    "message": text,
+                    "username": user,
+                    "timestamp": timestamp
+                }
+                
+                if smart_filter.should_alert(room_url, detection, message_hash):
+                    detected.append(detection)
+                    logger.info(f"Keyword alert passed smart filter: {keyword} from {user}")
+                else:
+                    logger.debug(f"Keyword alert filtered out: {keyword} from {user}")
+            
+            if skip_neutral and not may_carry_sentiment(text, lexicon):
+                continue
             
             try:
-                sentiment = analyzer.polarity_scores(text)
+                # VADER treats capitalization as emphasis, so it gets the original casing
+                sentiment = analyzer.polarity_scores(original)
                 compound_score = sentiment.get('compound')
                 
                 if compound_score is not None and NEGATIVE_SENTIMENT_THRESHOLD is not None and compound_score < NEGATIVE_SENTIMENT_THRESHOLD:
@@ -603,7 +793,7 @@ def process_chat_messages(messages, room_url, app):
                         "timestamp": timestamp
                     }
                     
-                    if smart_filter.should_alert(room_url, detection):
+                    if smart_filter.should_alert(room_url, detection, message_hash):
                         detected.append(detection)
                         logger.info(f"Negative sentiment alert passed smart filter: score {compound_score} from {user}")
                     else:
@@ -627,33 +817,38 @@ def log_chat_detection(detections, room_url, app):
         try:
             platform, streamer, _ = get_stream_info(room_url, app)
             assignment_id, agent_id = get_stream_assignment(room_url, app)
+            now = datetime.now()
             
-            for detection in detections:
-                details = {
-                    "type": detection.get("type"),
-                    "keyword": detection.get("keyword"),
-                    "sentiment_score": detection.get("sentiment_score"),
-                    "message": detection.get("message"),
-                    "username": detection.get("username"),
-                    "timestamp": detection.get("timestamp"),
-                    "streamer_name": streamer,
-                    "platform": platform,
-                    "assigned_agent": agent_id
-                }
-                
-                log_entry = DetectionLog(
+            log_entries = [
+                DetectionLog(
                     room_url=room_url,
                     event_type=f"chat_{detection.get('type')}_detection",
-                    details=details,
-                    timestamp=datetime.now(),
+                    details={
+                        "type": detection.get("type"),
+                        "keyword": detection.get("keyword"),
+                        "sentiment_score": detection.get("sentiment_score"),
+                        "message": detection.get("message"),
+                        "username": detection.get("username"),
+                        "timestamp": detection.get("timestamp"),
+                        "streamer_name": streamer,
+                        "platform": platform,
+                        "assigned_agent": agent_id
+                    },
+                    timestamp=now,
                     assigned_agent=agent_id,
                     assignment_id=assignment_id,
                     read=False
                 )
-                db.session.add(log_entry)
-                db.session.commit()
-                
-                notification_data = {
+                for detection in detections
+            ]
+            if not log_entries:
+                return
+            
+            # Flush assigns the ids; payloads are built before commit expires the rows
+            db.session.add_all(log_entries)
+            db.session.flush()
+            notifications = [
+                {
                     "id": log_entry.id,
                     "event_type": log_entry.event_type,
                     "timestamp": log_entry.timestamp.isoformat(),
@@ -664,11 +859,17 @@ def log_chat_detection(detections, room_url, app):
                     "platform": platform,
                     "assigned_agent": "Unassigned" if not agent_id else "Agent"
                 }
-                emit_notification(notification_data)
-                
+                for log_entry in log_entries
+            ]
+            db.session.commit()
+            
         except Exception as e:
             logger.error(f"Error logging chat detection for {room_url}: {e}")
             db.session.rollback()
+            return
+        
+        for notification_data in notifications:
+            emit_notification(notification_data)
 
 def get_filtering_stats(room_url=None):
     """Get smart filtering statistics"""
@@ -703,6 +904,40 @@ def reset_smart_filter(room_url=None):
         smart_filter.message_hashes.clear()
         logger.info("Reset all smart filter data")
 
+# Messages at least this similar are grouped together by get_duplicate_message_analysis
+DUPLICATE_SIMILARITY_THRESHOLD = 0.7
+
+def similar_text_pairs(texts, threshold):
+    """Yield each (i, j) pair of normalized texts that are at least threshold similar
+
+    The similarity ratio can never exceed 2 * min(len) / (len1 + len2), so with the
+    texts sorted by length each one is only scored against the following texts
+    short enough to reach the threshold.
+    """
+    order = sorted(range(len(texts)), key=lambda k: len(texts[k]))
+    lengths = [len(texts[k]) for k in order]
+    max_ratio = (2 - threshold) / threshold
+    
+    for pos, text_id in enumerate(order):
+        text = texts[text_id]
+        end = bisect.bisect_right(lengths, len(text) * max_ratio + 1e-9)
+        band = order[pos + 1:end]
+        if not band:
+            continue
+        if process is not None:
+            matches = process.extract(
+                text, [texts[k] for k in band],
+                scorer=fuzz.ratio,
+                score_cutoff=threshold * 100,
+                limit=None
+            )
+            for _, _, band_index in matches:
+                yield text_id, band[band_index]
+        else:
+            for other_id in band:
+                if smart_filter._is_similar(text, texts[other_id], threshold):
+                    yield text_id, other_id
+
 def get_duplicate_message_analysis(room_url, hours_back=1, app=None):
     """Analyze potential duplicate messages in recent logs for debugging"""
     if app is None:
@@ -710,46 +945,69 @@ def get_duplicate_message_analysis(room_url, hours_back=1, app=None):
     
     with app.app_context():
         cutoff_time = datetime.now() - timedelta(hours=hours_back)
-        logs = DetectionLog.query.filter(
+        # Only the fields the analysis reads are extracted from details, so the JSON blobs stay in the
+        # database; event types and flat field names match what log_chat_detection writes
+        details = DetectionLog.details
+        rows = db.session.query(
+            DetectionLog.id,
+            DetectionLog.timestamp,
+            details['message'].as_string(),
+            details['username'].as_string(),
+            details['type'].as_string(),
+            details['keyword'].as_string(),
+            details['sentiment_score'].as_float()
+        ).filter(
             DetectionLog.room_url == room_url,
             DetectionLog.timestamp >= cutoff_time,
-            DetectionLog.event_type.in_(['chat_detection', 'chat_sentiment_detection'])
+            DetectionLog.event_type.in_(['chat_keyword_detection', 'chat_sentiment_detection'])
         ).order_by(DetectionLog.timestamp.desc()).all()
         
-        messages = []
-        for log in logs:
-            detection = log.details.get('detection', {})
-            messages.append({
-                'id': log.id,
-                'message': detection.get('message', ''),
-                'username': detection.get('username', ''),
-                'type': detection.get('type', ''),
-                'keyword': detection.get('keyword'),
-                'sentiment_score': detection.get('sentiment_score'),
-                'timestamp': log.timestamp
-            })
+        messages = [
+            {
+                'id': log_id,
+                'message': message or '',
+                'username': username or '',
+                'type': detection_type or '',
+                'keyword': keyword,
+                'sentiment_score': sentiment_score,
+                'timestamp': timestamp
+            }
+            for log_id, timestamp, message, username, detection_type, keyword, sentiment_score in rows
+        ]
         
-        # Group similar messages
-        similar_groups = []
-        processed = set()
+        # Normalization is memoized per call rather than through normalize_message's LRU, which a
+        # large analysis window would flush of the live chat path's entries
+        normalized = {}
+        unique_ids = {}
+        text_ids = []
+        for msg in messages:
+            raw = msg['message']
+            text = normalized.get(raw)
+            if text is None:
+                text = normalized[raw] = normalize_message.__wrapped__(raw)
+            text_ids.append(unique_ids.setdefault(text, len(unique_ids)))
+        texts = list(unique_ids)
         
-        for i, msg1 in enumerate(messages):
-            if i in processed:
-                continue
-                
-            group = [msg1]
-            processed.add(i)
-            
-            for j, msg2 in enumerate(messages[i+1:], i+1):
-                if j in processed:
-                    continue
-                    
-                if smart_filter._calculate_similarity(msg1['message'], msg2['message']) >= 0.7:
-                    group.append(msg2)
-                    processed.add(j)
-            
-            if len(group) > 1:
-                similar_groups.append(group)
+        # Group similar messages as connected components of the similarity graph; messages that
+        # normalize to the same text share one node, so spam repeats are scored once
+        parent = list(range(len(texts)))
+        
+        def find(text_id):
+            while parent[text_id] != text_id:
+                parent[text_id] = parent[parent[text_id]]
+                text_id = parent[text_id]
+            return text_id
+        
+        for text_id, other_id in similar_text_pairs(texts, DUPLICATE_SIMILARITY_THRESHOLD):
+            root, other_root = find(text_id), find(other_id)
+            if root != other_root:
+                parent[other_root] = root
+        
+        # Groups and their members keep the newest-first order of the logs
+        components = defaultdict(list)
+        for msg, text_id in zip(messages, text_ids):
+            components[find(text_id)].append(msg)
+        similar_groups = [group for group in components.values() if len(group) > 1]
         
         return {
             'room_url': room_url,
@@ -784,7 +1042,7 @@ class FilterPerformanceMonitor:
         self.filter_calls = 0
         self.alerts_allowed = 0
         self.alerts_blocked = 0
-        self.start_time = datetime.now()
+        self.start_time_ns = time.monotonic_ns()
     
     def record_filter_call(self, allowed):
         self.filter_calls += 1
@@ -794,7 +1052,7 @@ class FilterPerformanceMonitor:
             self.alerts_blocked += 1
     
     def get_stats(self):
-        runtime = (datetime.now() - self.start_time).total_seconds()
+        runtime = (time.monotonic_ns() - self.start_time_ns) / NS_PER_SECOND
         return {
             'runtime_seconds': runtime,
             'total_filter_calls': self.filter_calls,
@@ -808,7 +1066,7 @@ class FilterPerformanceMonitor:
         self.filter_calls = 0
         self.alerts_allowed = 0
         self.alerts_blocked = 0
-        self.start_time = datetime.now()
+        self.start_time_ns = time.monotonic_ns()
 
 # Global performance monitor
 performance_monitor = FilterPerformanceMonitor()
@@ -816,8 +1074,8 @@ performance_monitor = FilterPerformanceMonitor()
 # Override the should_alert method to include performance monitoring
 original_should_alert = smart_filter.should_alert
 
-def monitored_should_alert(room_url, detection):
-    result = original_should_alert(room_url, detection)
+def monitored_should_alert(room_url, detection, message_hash=None):
+    result = original_should_alert(room_url, detection, message_hash)
     performance_monitor.record_filter_call(result)
     return result
 
@@ -83,7 +83,8 @@ class Stream(db.Model):
 
     __table_args__ = (
         db.Index('idx_streams_status_type', 'status', 'type'),
-        db.Index('idx_streams_status_monitored', 'status', 'is_monitored'),
+        db.Index('idx_streams_status_monitored', 'status', 'is_monitored',
+                 postgresql_include=['id', 'room_url', 'streamer_username', 'type']),
     )
 
     def __repr__(self):
@@ -328,6 +329,7 @@ class DetectionLog(db.Model):
     __table_args__ = (
         db.Index('idx_detection_logs_event_timestamp', 'event_type', 'timestamp'),
         db.Index('idx_detection_logs_assigned_agent', 'assigned_agent'),
+        db.Index('idx_detection_logs_room_timestamp', 'room_url', 'timestamp'),
     )
 
     def serialize(self, minimal=False):
@@ -0,0 +1,133 @@
+import time
+from collections import Counter, defaultdict
+
+import pytest
+
+pytest.importorskip('gevent')
+pytest.importorskip('flask_sqlalchemy')
+
+import gevent
+from flask import Flask
+
+import chat_processing
+from extensions import db
+
+
+def test_smart_filter_bounds_tracked_rooms(monkeypatch):
+    monkeypatch.setattr(chat_processing, 'MAX_TRACKED_ROOMS', 2)
+    smart_filter = chat_processing.SmartChatFilter()
+    for i, room_url in enumerate(('room-a', 'room-b', 'room-a', 'room-c')):
+        detection = {'message': f'message {i} in {room_url}', 'username': 'alice', 'type': 'chat'}
+        smart_filter.should_alert(room_url, detection)
+    assert list(smart_filter.recent_alerts) == ['room-a', 'room-c']
+    assert list(smart_filter.message_hashes) == ['room-a', 'room-c']
+
+
+def test_pick_proxy_weights_by_score_and_skips_used(monkeypatch):
+    scores = {'a:1': 0, 'b:1': 5, 'c:1': 15}
+    monkeypatch.setattr(chat_processing, '_AVAILABLE_PROXIES', set(scores))
+    monkeypatch.setattr(chat_processing, '_proxy_score', scores.__getitem__)
+    monkeypatch.setattr(chat_processing, 'PROXY_WEIGHT_BASE', 5)
+    chat_processing.random.seed(7)
+    picks = Counter(chat_processing._pick_proxy(set()) for _ in range(14000))
+    assert picks['a:1'] == pytest.approx(2000, rel=0.1)
+    assert picks['b:1'] == pytest.approx(4000, rel=0.1)
+    assert picks['c:1'] == pytest.approx(8000, rel=0.1)
+    assert {chat_processing._pick_proxy({'c:1'}) for _ in range(50)} == {'a:1', 'b:1'}
+    assert chat_processing._pick_proxy(set(scores)) is None
+
+
+@pytest.fixture
+def app(monkeypatch):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    monkeypatch.setattr(chat_processing, 'emit_notification', lambda data: None)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+def test_duplicate_analysis_reads_logged_chat_detections(app):
+    room_url = 'https://chaturbate.com/alice/'
+    chat_processing.log_chat_detection([
+        {'type': 'keyword', 'keyword': 'kill', 'message': 'I will kill you', 'username': 'bob'},
+        {'type': 'keyword', 'keyword': 'kill', 'message': 'I will kill you!!', 'username': 'carol'},
+        {'type': 'sentiment', 'sentiment_score': -0.9, 'message': 'you are awful', 'username': 'dave'},
+    ], room_url, app)
+
+    analysis = chat_processing.get_duplicate_message_analysis(room_url, app=app)
+
+    assert analysis['total_messages'] == 3
+    assert analysis['similar_groups'] == 1
+    [group] = analysis['groups']
+    assert {msg['username'] for msg in group} == {'bob', 'carol'}
+    assert {msg['keyword'] for msg in group} == {'kill'}
+
+
+def test_duplicate_analysis_groups_chains_within_one_room(app):
+    room_a = 'https://chaturbate.com/alice/'
+    room_b = 'https://chaturbate.com/bob/'
+    # Each neighbour in the chain is 70% similar, but the ends are only 40% similar
+    chain = ['aaaaaaaaaa', 'aaaaaaabbb', 'aaaabbbbbb']
+    chat_processing.log_chat_detection([
+        {'type': 'keyword', 'keyword': 'a', 'message': text, 'username': f'user{i}'}
+        for i, text in enumerate(chain)
+    ], room_a, app)
+    chat_processing.log_chat_detection([
+        {'type': 'keyword', 'keyword': 'a', 'message': 'aaaaaaaaaa', 'username': 'other'},
+        {'type': 'keyword', 'keyword': 'z', 'message': 'zzzzzzzzzz', 'username': 'other'},
+    ], room_b, app)
+
+    analysis = chat_processing.get_duplicate_message_analysis(room_a, app=app)
+    assert analysis['total_messages'] == 3
+    assert analysis['similar_groups'] == 1
+    assert sorted(msg['message'] for msg in analysis['groups'][0]) == sorted(chain)
+
+    analysis = chat_processing.get_duplicate_message_analysis(room_b, app=app)
+    assert analysis['total_messages'] == 2
+    assert analysis['similar_groups'] == 0
+
+
+@pytest.fixture
+def proxies(monkeypatch):
+    names = iter(f'10.0.0.{i}:80' for i in range(1, 100))
+
+    def fake_random_proxy(used_proxies=None):
+        proxy = next(names)
+        return {'http': f'http://{proxy}', 'https': f'http://{proxy}'}, proxy
+
+    failed = []
+    monkeypatch.setattr(chat_processing, 'get_random_proxy', fake_random_proxy)
+    monkeypatch.setattr(chat_processing, '_mark_proxy_failed', failed.append)
+    monkeypatch.setattr(chat_processing, 'PROXY_STATS', defaultdict(chat_processing.ProxyStats))
+    monkeypatch.setattr(chat_processing, 'CHAT_HEDGE_WIDTH', 3)
+    return failed
+
+
+def test_hedged_request_survives_a_lost_first_request(proxies):
+    lost = {'cancelled': False}
+
+    def send(proxy_dict):
+        if proxy_dict['http'].endswith('10.0.0.1:80'):
+            try:
+                gevent.sleep(30)  # The first request never comes back
+            finally:
+                lost['cancelled'] = True
+        if proxy_dict['http'].endswith('10.0.0.2:80'):
+            raise ConnectionError('reset')
+        gevent.sleep(0.01)
+        return {'proxy': proxy_dict['http']}
+
+    started = time.monotonic()
+    result, proxy = chat_processing._hedged_proxy_request(send, 'test fetch')
+    gevent.sleep(0)
+
+    assert time.monotonic() - started < 5
+    assert result == {'proxy': 'http://10.0.0.3:80'}
+    assert proxy == '10.0.0.3:80'
+    assert lost['cancelled']
+    assert proxies == ['10.0.0.2:80']
+    assert chat_processing.PROXY_STATS['10.0.0.3:80'].successes == 1
+    assert chat_processing.PROXY_STATS['10.0.0.2:80'].failures == 1
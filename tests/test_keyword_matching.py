@@ -0,0 +1,30 @@
+import pytest
+
+pytest.importorskip('flask')
+
+from utils import keyword_matching
+
+
+@pytest.fixture
+def regex_matcher(monkeypatch):
+    monkeypatch.setattr(keyword_matching, 'ahocorasick', None)
+    monkeypatch.setattr(keyword_matching, '_KEYWORD_MATCHER_CACHE', {})
+    monkeypatch.setattr(keyword_matching, '_KEYWORD_RE_CACHE', {})
+    return keyword_matching.get_keyword_matcher
+
+
+def test_regex_fallback_reports_keywords_sharing_a_start(regex_matcher):
+    matcher = regex_matcher(['ass', 'assault', 'kill'])
+    assert set(matcher('assault and kill')) == {'ass', 'assault', 'kill'}
+
+
+def test_regex_fallback_matches_substring_check(regex_matcher):
+    keywords = ['ab', 'abc', 'bc', 'c', 'zzz']
+    text = 'xabcx'
+    matcher = regex_matcher(keywords)
+    assert set(matcher(text)) == {kw for kw in keywords if kw in text}
+
+
+def test_match_flagged_keywords_lowercases_and_dedupes():
+    keywords = ['kill', 'gun']
+    assert keyword_matching.match_flagged_keywords('Kill the GUN, kill it', keywords) == ['kill', 'gun']
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+from fractions import Fraction
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip('av')
+pytest.importorskip('gevent')
+pytest.importorskip('psutil')
+pytest.importorskip('flask_sqlalchemy')
+
+import gevent
+from flask import Flask
+from gevent.event import Event
+from gevent.queue import Queue
+
+import _monitoring
+
+
+class FakeAudioStream:
+    type = 'audio'
+
+
+class FakePacket:
+    def __init__(self, stream, duration=1, time_base=Fraction(1, 4)):
+        self.stream = stream
+        self.dts = 0
+        self.is_keyframe = True
+        self.duration = duration
+        self.time_base = time_base
+
+
+class FakeContainer:
+    """Container whose demux blocks the calling thread like FFmpeg's network reads."""
+
+    def __init__(self, packets=20, read_delay=0.05):
+        self.streams = [FakeAudioStream()]
+        self.packets = packets
+        self.read_delay = read_delay
+        self.closed = False
+
+    def demux(self, *streams):
+        for _ in range(self.packets):
+            time.sleep(self.read_delay)
+            yield FakePacket(self.streams[0])
+
+    def close(self):
+        self.closed = True
+
+
+def test_duration_queue_keeps_most_recent_seconds():
+    stream = FakeAudioStream()
+    queue = _monitoring.DurationQueue(1.0)
+    packets = [FakePacket(stream) for _ in range(25)]
+    for packet in packets:
+        _monitoring._put_latest(queue, packet)
+    assert queue.qsize() == 4
+    assert queue.get_nowait() is packets[21]
+    assert queue.seconds == pytest.approx(0.75)
+
+
+def test_demux_pump_does_not_block_other_greenlets(monkeypatch):
+    container = FakeContainer()
+    monkeypatch.setattr(_monitoring.av, 'open', lambda *args, **kwargs: container)
+    cancel_event = Event()
+    media = {
+        'container': None,
+        'video_q': Queue(maxsize=_monitoring.VIDEO_PACKET_QUEUE_SIZE),
+        'audio_q': _monitoring.DurationQueue(30)
+    }
+    pump = gevent.spawn(_monitoring._demux_pump, Flask(__name__), 'http://example.com/live.m3u8', 1, media, cancel_event)
+
+    ticks = 0
+    routed = 0
+    deadline = time.monotonic() + container.packets * container.read_delay
+    while time.monotonic() < deadline:
+        gevent.sleep(0.01)
+        ticks += 1
+        routed = max(routed, media['audio_q'].qsize())
+
+    cancel_event.set()
+    pump.join(timeout=5)
+    assert pump.dead
+    assert ticks >= 20
+    assert routed > 0
+    assert container.closed
+
+
+class ProbeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    playlist = b'#EXTM3U\n' + b'#EXT-X-VERSION:3\n' * 1000
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        # Ignores Range, like many CDNs, so the probe has to drain the rest of the body
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(self.playlist)))
+        self.end_headers()
+        self.wfile.write(self.playlist)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def probe_server(monkeypatch):
+    monkeypatch.setattr(_monitoring, '_availability_cache', OrderedDict())
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ProbeHandler)
+    server.connections = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _monitoring._probe_session.close()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def probe_url(server, path):
+    return f'http://127.0.0.1:{server.server_port}{path}'
+
+
+def test_availability_probes_reuse_one_connection(probe_server):
+    for _ in range(3):
+        assert _monitoring.check_stream_availability(probe_url(probe_server, '/live.m3u8'), max_age=0)
+        assert _monitoring.check_stream_availability(probe_url(probe_server, '/room'), max_age=0)
+    assert probe_server.connections == 1
+
+
+def test_availability_cache_is_bounded(probe_server, monkeypatch):
+    monkeypatch.setattr(_monitoring, 'PROBE_CACHE_SIZE', 2)
+    urls = [probe_url(probe_server, f'/live.m3u8?token={token}') for token in range(5)]
+    for url in urls:
+        _monitoring.check_stream_availability(url)
+    assert list(_monitoring._availability_cache) == urls[3:]
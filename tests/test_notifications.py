@@ -0,0 +1,81 @@
+import pytest
+
+pytest.importorskip('flask_socketio')
+pytest.importorskip('flask_sqlalchemy')
+
+from utils import notifications
+
+
+class FakeSocketIO:
+    def __init__(self):
+        self.emitted = []
+
+    def emit(self, event, data, room=None, namespace=None):
+        self.emitted.append((event, data, room))
+
+
+class FakeQuery:
+    def filter_by(self, **kwargs):
+        return self
+
+    def first(self):
+        return None
+
+
+class FakeStream:
+    query = FakeQuery()
+
+
+@pytest.fixture
+def socketio(monkeypatch):
+    fake = FakeSocketIO()
+    monkeypatch.setattr(notifications, 'get_socketio', lambda: fake)
+    monkeypatch.setattr(notifications, 'Stream', FakeStream)
+    return fake
+
+
+def audio_payload(keywords, transcript='they said kill and ass'):
+    return {
+        'event_type': 'audio_keyword_alert',
+        'timestamp': '2024-01-01T00:00:00',
+        'details': {
+            'keyword': keywords,
+            'transcript': transcript,
+            'streamer_name': 'streamer',
+            'platform': 'chaturbate',
+            'stream_url': 'https://example.com/stream.m3u8'
+        },
+        'read': False,
+        'room_url': 'https://chaturbate.com/streamer/',
+        'streamer': 'streamer',
+        'platform': 'chaturbate',
+        'assigned_agent': 'Unassigned'
+    }
+
+
+def chat_payload(username, message='you are trash'):
+    return {
+        'event_type': 'chat_alert',
+        'timestamp': '2024-01-01T00:00:00',
+        'details': {'type': 'keyword', 'message': message, 'username': username},
+        'read': False,
+        'room_url': 'https://chaturbate.com/streamer/',
+        'assigned_agent': 'Unassigned'
+    }
+
+
+def test_audio_payload_with_keyword_list_is_emitted(socketio):
+    assert notifications.emit_notification_batch([audio_payload(['kill', 'ass'])]) is True
+    broadcast = [data for event, data, room in socketio.emitted if room is None]
+    assert [data['details']['keyword'] for data in broadcast] == [['kill', 'ass']]
+
+
+def test_identical_audio_payloads_are_deduplicated(socketio):
+    notifications.emit_notification_batch([audio_payload(['kill']), audio_payload(['kill'])])
+    assert len([room for _, _, room in socketio.emitted if room is None]) == 1
+
+
+def test_same_chat_message_from_different_users_is_kept(socketio):
+    notifications.emit_notification_batch([chat_payload('alice'), chat_payload('bob')])
+    broadcast = [data for event, data, room in socketio.emitted if room is None]
+    assert [data['details']['username'] for data in broadcast] == ['alice', 'bob']
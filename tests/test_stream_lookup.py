@@ -0,0 +1,86 @@
+import pytest
+
+pytest.importorskip('flask_sqlalchemy')
+
+from flask import Flask
+
+from extensions import db
+from models import Assignment, ChaturbateStream, User
+from utils import stream_lookup
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def streams(app, monkeypatch):
+    monkeypatch.setattr(stream_lookup, '_stream_lookup_cache', {})
+    rooms = []
+    for name in ('alice', 'bob'):
+        stream = ChaturbateStream(room_url=f'https://chaturbate.com/{name}/', streamer_username=name,
+                                  chaturbate_m3u8_url=f'https://edge.example.com/{name}.m3u8',
+                                  broadcaster_uid=f'{name}-uid')
+        db.session.add(stream)
+        rooms.append(stream)
+    db.session.commit()
+    for stream in rooms:
+        stream_lookup.lookup_stream(stream.room_url)
+        stream_lookup.lookup_stream(stream.chaturbate_m3u8_url)
+    return rooms
+
+
+def cached_urls():
+    return set(stream_lookup._stream_lookup_cache)
+
+
+def test_lookup_resolves_room_and_m3u8_urls(streams):
+    alice, _ = streams
+    by_room = stream_lookup.lookup_stream(alice.room_url)
+    by_m3u8 = stream_lookup.lookup_stream(alice.chaturbate_m3u8_url)
+    assert by_room == by_m3u8
+    assert by_room.platform == 'chaturbate'
+    assert by_room.streamer == 'alice'
+    assert by_room.broadcaster_uid == 'alice-uid'
+    assert by_room.assignment_id is None
+    assert stream_lookup.lookup_stream('https://chaturbate.com/nobody/') is None
+
+
+def test_status_update_keeps_cached_lookups(streams):
+    streams[0].status = 'online'
+    db.session.commit()
+    assert len(cached_urls()) == 4
+
+
+def test_identity_update_evicts_only_that_stream(streams):
+    alice, bob = streams
+    old_m3u8 = alice.chaturbate_m3u8_url
+    alice.chaturbate_m3u8_url = 'https://edge.example.com/alice-2.m3u8'
+    db.session.commit()
+    assert cached_urls() == {bob.room_url, bob.chaturbate_m3u8_url}
+    assert old_m3u8 not in cached_urls()
+
+
+def test_delete_evicts_stream(streams):
+    alice, bob = streams
+    db.session.delete(alice)
+    db.session.commit()
+    assert cached_urls() == {bob.room_url, bob.chaturbate_m3u8_url}
+
+
+def test_assignment_evicts_its_stream(streams):
+    alice, bob = streams
+    agent = User(username='agent', email='agent@example.com', password='x', role='agent')
+    db.session.add(agent)
+    db.session.commit()
+    db.session.add(Assignment(agent_id=agent.id, stream_id=alice.id))
+    db.session.commit()
+    assert cached_urls() == {bob.room_url, bob.chaturbate_m3u8_url}
+    assert stream_lookup.lookup_stream(alice.room_url).agent_id == agent.id
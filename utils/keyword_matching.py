@@ -0,0 +1,84 @@
+# utils/keyword_matching.py
+import re
+import logging
+from collections import defaultdict
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+logger = logging.getLogger(__name__)
+
+# Compiled keyword alternation and keyword matcher, keyed by the keyword tuple they were built from
+KEYWORD_CACHE_SIZE = 4
+_KEYWORD_RE_CACHE = {}
+_KEYWORD_MATCHER_CACHE = {}
+
+def _cache_store(cache, key, value):
+    """Store value under key, dropping the oldest entry once KEYWORD_CACHE_SIZE is reached"""
+    if len(cache) >= KEYWORD_CACHE_SIZE:
+        cache.pop(next(iter(cache)))
+    cache[key] = value
+    return value
+
+def get_keyword_pattern(keywords):
+    """Compile flagged keywords into one alternation, rebuilding only when they change
+
+    The lookahead lets matches overlap, so every position where some keyword
+    starts is found; only the longest keyword at each position is captured.
+    """
+    key = tuple(keywords)
+    pattern = _KEYWORD_RE_CACHE.get(key)
+    if pattern is None:
+        alternation = '|'.join(re.escape(kw) for kw in sorted(set(keywords), key=len, reverse=True))
+        pattern = _cache_store(_KEYWORD_RE_CACHE, key, re.compile(f'(?=({alternation}))'))
+    return pattern
+
+def _regex_keyword_matcher(keywords):
+    """Build the regex fallback matcher, reporting every keyword that starts at each match
+
+    The alternation captures one keyword per position, so the others sharing that
+    start (e.g. "ass" within "assault") are recovered by checking the keywords
+    with the same first character.
+    """
+    pattern = get_keyword_pattern(keywords)
+    by_first_char = defaultdict(list)
+    for kw in dict.fromkeys(keywords):
+        if kw:
+            by_first_char[kw[0]].append(kw)
+
+    def matcher(text):
+        for m in pattern.finditer(text):
+            start = m.start()
+            for kw in by_first_char.get(text[start:start + 1], ()):
+                if text.startswith(kw, start):
+                    yield kw
+    return matcher
+
+def get_keyword_matcher(keywords):
+    """Return a function yielding every flagged keyword found in lowercased text
+
+    An Aho-Corasick automaton scans the text once regardless of how many keywords
+    there are; the regex alternation is used when pyahocorasick is not installed.
+    """
+    key = tuple(keywords)
+    matcher = _KEYWORD_MATCHER_CACHE.get(key)
+    if matcher is None:
+        if ahocorasick is not None and keywords:
+            automaton = ahocorasick.Automaton()
+            for kw in keywords:
+                automaton.add_word(kw, kw)
+            automaton.make_automaton()
+            logger.debug(f"Built keyword automaton with {len(keywords)} keywords")
+            matcher = lambda text: (kw for _, kw in automaton.iter(text))
+        else:
+            matcher = _regex_keyword_matcher(keywords)
+        _cache_store(_KEYWORD_MATCHER_CACHE, key, matcher)
+    return matcher
+
+def match_flagged_keywords(text, keywords):
+    """Return the distinct flagged keywords contained in text, in order of first match"""
+    if not keywords:
+        return []
+    return list(dict.fromkeys(get_keyword_matcher(keywords)(text.lower())))
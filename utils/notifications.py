@@ -80,6 +80,82 @@ def emit_notification(notification_data, forward_to_main=False):
             forward_to_main_app('notification', notification_data, namespace)
         return False
 
+def _notification_key(notification_data):
+    """Identity of a notification within a batch, used to drop duplicates
+
+    Audio payloads carry the list of detected keywords, so lists are turned into
+    tuples to keep the key hashable. Alert type and sender are part of the key so
+    the same text from two users, or as keyword and sentiment alerts, is kept.
+    """
+    details = notification_data.get('details') or {}
+    keyword = details.get('keyword')
+    if isinstance(keyword, list):
+        keyword = tuple(keyword)
+    return (
+        notification_data.get('event_type'),
+        notification_data.get('room_url'),
+        details.get('type'),
+        details.get('username'),
+        keyword,
+        details.get('message')
+    )
+
+def emit_notification_batch(notifications, forward_to_main=False):
+    """Emit a batch of notifications, resolving shared lookups once per batch"""
+    namespace = '/notifications'
+    if not notifications:
+        return True
+
+    # Drop duplicates within the batch, keeping the first occurrence
+    unique = {}
+    for notification_data in notifications:
+        unique.setdefault(_notification_key(notification_data), notification_data)
+    notifications = list(unique.values())
+
+    try:
+        socketio = get_socketio()
+        if not socketio:
+            logger.error("SocketIO instance not found")
+            return False
+
+        stream_ids = {}
+        agent_ids = {}
+        for notification_data in notifications:
+            socketio.emit('notification', notification_data, namespace=namespace)
+            socketio.emit('notification', notification_data, room='role_admin', namespace=namespace)
+
+            stream_url = notification_data.get('room_url')
+            if not stream_url:
+                continue
+            if stream_url not in stream_ids:
+                stream = Stream.query.filter_by(room_url=stream_url).first()
+                stream_ids[stream_url] = stream.id if stream else None
+            stream_id = stream_ids[stream_url]
+            if stream_id is None:
+                continue
+            socketio.emit('notification', notification_data, room=f"stream_{stream_id}", namespace=namespace)
+
+            assigned_agent = notification_data.get('assigned_agent')
+            if assigned_agent and assigned_agent != 'Unassigned':
+                if assigned_agent not in agent_ids:
+                    agent = User.query.filter_by(username=assigned_agent).first()
+                    agent_ids[assigned_agent] = agent.id if agent else None
+                if agent_ids[assigned_agent] is not None:
+                    socketio.emit('notification', notification_data, room=f"user_{agent_ids[assigned_agent]}", namespace=namespace)
+
+        logger.info(f"Emitted batch of {len(notifications)} notifications")
+
+        if forward_to_main:
+            for notification_data in notifications:
+                forward_to_main_app('notification', notification_data, namespace)
+        return True
+    except Exception as e:
+        logger.error(f"Error emitting notification batch: {str(e)}")
+        if forward_to_main:
+            for notification_data in notifications:
+                forward_to_main_app('notification', notification_data, namespace)
+        return False
+
 def emit_notification_update(notification_id, update_type='read', forward_to_main=False):
     """Emit a notification update (read, deleted, etc.) to all connected clients"""
     namespace = '/notifications'
@@ -125,6 +201,33 @@ def emit_stream_update(stream_data, forward_to_main=False):
             forward_to_main_app('stream_update', stream_data, namespace)
         return False
 
+def emit_stream_updates(updates, forward_to_main=False):
+    """Emit a batch of stream updates with a single SocketIO lookup"""
+    namespace = '/notifications'
+    if not updates:
+        return True
+
+    try:
+        socketio = get_socketio()
+        if not socketio:
+            logger.error("SocketIO instance not found")
+            return False
+
+        for stream_data in updates:
+            socketio.emit('stream_update', stream_data, namespace=namespace)
+        logger.info(f"Emitted {len(updates)} stream updates")
+
+        if forward_to_main:
+            for stream_data in updates:
+                forward_to_main_app('stream_update', stream_data, namespace)
+        return True
+    except Exception as e:
+        logger.error(f"Error emitting stream updates: {str(e)}")
+        if forward_to_main:
+            for stream_data in updates:
+                forward_to_main_app('stream_update', stream_data, namespace)
+        return False
+
 def emit_message_update(message_data, forward_to_main=False):
     """Emit a message notification to specific recipients"""
     namespace = '/notifications'
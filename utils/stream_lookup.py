@@ -0,0 +1,112 @@
+# utils/stream_lookup.py
+import os
+import time
+from collections import namedtuple
+from sqlalchemy import event, inspect, or_
+from sqlalchemy.orm import with_polymorphic
+from models import Stream, ChaturbateStream, StripchatStream, Assignment
+from extensions import db
+
+# Stream plus its platform subclasses, loaded in one joined SELECT
+STREAM_POLY = with_polymorphic(Stream, [ChaturbateStream, StripchatStream], flat=True)
+
+# Room/M3U8 URL lookups; stream identity is stable, so entries live for STREAM_CACHE_TTL seconds
+STREAM_CACHE_TTL = float(os.getenv('STREAM_CACHE_TTL', 300))
+STREAM_CACHE_SIZE = 4096
+_stream_lookup_cache = {}  # URL -> (fetched_at, StreamLookup)
+
+StreamLookup = namedtuple('StreamLookup', 'stream_id platform streamer broadcaster_uid assignment_id agent_id')
+
+# Columns that identify a stream in the URL-keyed lookup cache; status writes leave cached entries valid
+STREAM_IDENTITY_COLUMNS = ('room_url', 'type', 'streamer_username', 'broadcaster_uid',
+                           'chaturbate_m3u8_url', 'stripchat_m3u8_url')
+
+def cache_get(cache, key, ttl=STREAM_CACHE_TTL):
+    """Return a cached value younger than ttl seconds, or None"""
+    cached = cache.get(key)
+    if cached and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+    return None
+
+def cache_put(cache, key, value, max_size=STREAM_CACHE_SIZE):
+    """Cache a value, evicting the oldest insertion once the cache is full"""
+    if key not in cache and len(cache) >= max_size:
+        cache.pop(next(iter(cache)))
+    cache[key] = (time.monotonic(), value)
+    return value
+
+def cached_stream_lookup(stream_url):
+    """Return the cached StreamLookup for a URL without touching the database, or None"""
+    return cache_get(_stream_lookup_cache, stream_url)
+
+def lookup_stream(stream_url):
+    """Resolve a room or M3U8 URL to its stream and first assignment, or None if no stream matches
+
+    One query fills the cache entry; callers must be inside an app context.
+    """
+    cached = cache_get(_stream_lookup_cache, stream_url)
+    if cached is not None:
+        return cached
+
+    row = db.session.query(STREAM_POLY, Assignment.id, Assignment.agent_id).outerjoin(
+        Assignment, Assignment.stream_id == STREAM_POLY.id
+    ).filter(or_(
+        STREAM_POLY.room_url == stream_url,
+        STREAM_POLY.ChaturbateStream.chaturbate_m3u8_url == stream_url,
+        STREAM_POLY.StripchatStream.stripchat_m3u8_url == stream_url
+    )).order_by(Assignment.id).first()
+    if not row:
+        return None
+    stream, assignment_id, agent_id = row
+    return cache_put(_stream_lookup_cache, stream_url, StreamLookup(
+        stream.id, stream.type.lower(), stream.streamer_username,
+        getattr(stream, 'broadcaster_uid', None), assignment_id, agent_id
+    ))
+
+def clear_stream_lookups():
+    """Drop every cached stream lookup so the next call hits the database"""
+    _stream_lookup_cache.clear()
+
+def stream_cache_urls(target, changed_only=True):
+    """Return the room and M3U8 URLs a written stream may be cached under
+
+    With changed_only, returns nothing unless one of STREAM_IDENTITY_COLUMNS
+    changed. Old URL values are included so renamed entries are dropped too.
+    Only loaded values are read, so this never queries from inside a flush.
+    """
+    state = inspect(target)
+    urls = set()
+    changed = not changed_only
+    for name in STREAM_IDENTITY_COLUMNS:
+        if name not in state.mapper.attrs:
+            continue
+        history = state.attrs[name].history
+        changed = changed or history.has_changes()
+        if name.endswith('_url'):
+            urls.update(history.deleted)
+            urls.add(state.dict.get(name))
+    if not changed:
+        return set()
+    urls.discard(None)
+    return urls
+
+def _evict_updated_stream(mapper, connection, target):
+    # Status-only writes are the common case and leave the cached identity valid
+    for url in stream_cache_urls(target):
+        _stream_lookup_cache.pop(url, None)
+
+def _evict_deleted_stream(mapper, connection, target):
+    for url in stream_cache_urls(target, changed_only=False):
+        _stream_lookup_cache.pop(url, None)
+
+def _evict_assigned_stream(mapper, connection, target):
+    state = inspect(target)
+    stream_ids = {state.dict.get('stream_id'), *state.attrs.stream_id.history.deleted}
+    for url, (_, lookup) in list(_stream_lookup_cache.items()):
+        if lookup.stream_id in stream_ids:
+            del _stream_lookup_cache[url]
+
+event.listen(Stream, 'after_update', _evict_updated_stream, propagate=True)
+event.listen(Stream, 'after_delete', _evict_deleted_stream, propagate=True)
+for _event_name in ('after_insert', 'after_update', 'after_delete'):
+    event.listen(Assignment, _event_name, _evict_assigned_stream)
@@ -23,12 +23,21 @@ logger = logging.getLogger(__name__)
 
 # External dependencies - initialize with default values
 _yolo_model = None
+_yolo_net = None
+_yolo_device = 'cpu'
 last_visual_alerts = {}
 
-def initialize_video_globals(yolo_model=None):
+# Input size and thresholds for the cv2.dnn (ONNX) YOLO path
+YOLO_INPUT_SIZE = 640
+YOLO_SCORE_THRESHOLD = 0.25
+YOLO_NMS_THRESHOLD = 0.45
+
+def initialize_video_globals(yolo_model=None, yolo_net=None, yolo_device='cpu'):
     """Initialize global variables for YOLO model"""
-    global _yolo_model
+    global _yolo_model, _yolo_net, _yolo_device
     _yolo_model = yolo_model
+    _yolo_net = yolo_net
+    _yolo_device = yolo_device
     logger.info("Video globals initialized")
 
 def load_yolo_model(app):
@@ -145,11 +154,52 @@ def get_stream_assignment(stream_url, app):
         logger.error(f"Error getting stream assignment: {e}")
         return None, None
 
+def _predict_ultralytics(frame):
+    """Run the ultralytics model and yield (bbox, confidence, class_id) tuples"""
+    on_gpu = _yolo_device.startswith('cuda')
+    for result in _yolo_model.predict(frame, verbose=False, device=_yolo_device, half=on_gpu):
+        for box in result.boxes:
+            try:
+                yield (
+                    box.xyxy[0].cpu().numpy().tolist(),
+                    float(box.conf[0].cpu().numpy()),
+                    int(box.cls[0].cpu().numpy())
+                )
+            except Exception as box_error:
+                logger.error(f"Error processing detection box: {box_error}")
+
+def _predict_dnn(frame):
+    """Run the quantized ONNX model through cv2.dnn and yield (bbox, confidence, class_id) tuples"""
+    height, width = frame.shape[:2]
+    blob = cv2.dnn.blobFromImage(frame, 1 / 255.0, (YOLO_INPUT_SIZE, YOLO_INPUT_SIZE), swapRB=True, crop=False)
+    _yolo_net.setInput(blob)
+    # Output is (1, 4 + num_classes, num_anchors): cx, cy, w, h then class scores
+    output = _yolo_net.forward()[0].T
+    scores = output[:, 4:]
+    class_ids = scores.argmax(axis=1)
+    confidences = scores[np.arange(len(class_ids)), class_ids]
+    keep = confidences >= YOLO_SCORE_THRESHOLD
+    if not keep.any():
+        return
+    boxes, confidences, class_ids = output[keep, :4], confidences[keep], class_ids[keep]
+    
+    scale = np.array([width, height, width, height], dtype=np.float32) / YOLO_INPUT_SIZE
+    boxes = boxes * scale
+    xywh = np.column_stack((boxes[:, 0] - boxes[:, 2] / 2, boxes[:, 1] - boxes[:, 3] / 2, boxes[:, 2], boxes[:, 3]))
+    indices = cv2.dnn.NMSBoxes(xywh.tolist(), confidences.tolist(), YOLO_SCORE_THRESHOLD, YOLO_NMS_THRESHOLD)
+    for i in np.array(indices).flatten():
+        x, y, w, h = xywh[i]
+        yield [float(x), float(y), float(x + w), float(y + h)], float(confidences[i]), int(class_ids[i])
+
+def _class_name(cls_id):
+    names = getattr(_yolo_model, 'names', None) or {}
+    return names.get(cls_id, str(cls_id)).lower()
+
 # video_processing.py
 def process_video_frame(frame, stream_url, app):
     """Process a video frame and return detections"""
     with app.app_context():  # Ensure context
-        if not _yolo_model:
+        if not _yolo_model and _yolo_net is None:
             return []
         
         try:
@@ -158,40 +208,31 @@ def process_video_frame(frame, stream_url, app):
                 return []
                 
             now = datetime.now()
-            results = _yolo_model.predict(frame, verbose=False)
+            use_dnn = _yolo_net is not None and not _yolo_device.startswith('cuda')
+            predictions = _predict_dnn(frame) if use_dnn else _predict_ultralytics(frame)
             detections = []
             
-            for result in results:
-                boxes = result.boxes
-                for box in boxes:
-                    try:
-                        bbox = box.xyxy[0].cpu().numpy()
-                        conf = float(box.conf[0].cpu().numpy())
-                        cls_id = int(box.cls[0].cpu().numpy())
-                        cls_name = _yolo_model.names.get(cls_id, str(cls_id)).lower()
-                        
-                        if cls_name not in flagged or conf < flagged[cls_name]:
-                            continue
-                        
-                        if cls_name in last_visual_alerts.get(stream_url, {}):
-                            last_alert = last_visual_alerts[stream_url][cls_name]
-                            cooldown = app.config.get('VISUAL_ALERT_COOLDOWN', 60)
-                            if (now - last_alert).total_seconds() < cooldown:
-                                continue
-                        
-                        last_visual_alerts.setdefault(stream_url, {})[cls_name] = now
-                        
-                        detections.append({
-                            "class": cls_name,
-                            "confidence": conf,
-                            "bbox": bbox.tolist(),
-                            "timestamp": now.isoformat()
-                        })
-                        
-                    except Exception as box_error:
-                        logger.error(f"Error processing detection box: {box_error}")
+            for bbox, conf, cls_id in predictions:
+                cls_name = _class_name(cls_id)
+                
+                if cls_name not in flagged or conf < flagged[cls_name]:
+                    continue
+                
+                if cls_name in last_visual_alerts.get(stream_url, {}):
+                    last_alert = last_visual_alerts[stream_url][cls_name]
+                    cooldown = app.config.get('VISUAL_ALERT_COOLDOWN', 60)
+                    if (now - last_alert).total_seconds() < cooldown:
                         continue
                 
+                last_visual_alerts.setdefault(stream_url, {})[cls_name] = now
+                
+                detections.append({
+                    "class": cls_name,
+                    "confidence": conf,
+                    "bbox": bbox,
+                    "timestamp": now.isoformat()
+                })
+                
             return detections
             
         except Exception as e:
@@ -270,11 +311,12 @@ def log_video_detection(detections, frame, stream_url, app):
 
 def cleanup_video_resources(app):
     """Clean up video processing resources"""
-    global _yolo_model
+    global _yolo_model, _yolo_net
     try:
         if _yolo_model is not None:
             del _yolo_model
             _yolo_model = None
+        _yolo_net = None
         logger.info("Video processing resources cleaned up")
     except Exception as e:
         logger.error(f"Error cleaning up video resources: {e}")
\ No newline at end of file